@@ -1,9 +1,47 @@
+import asyncio
+import json
+import math
 from fastapi import APIRouter, HTTPException, Request, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 
+from app.core.config import Config
+from app.services import analytics, data_query, exporter
+from app.services.events import events
+from app.services.response_cache import response_cache
+from app.services.runner import PRIORITY_MANUAL
+
 router = APIRouter()
 
+# Fields the edit form is allowed to change on an existing source
+UPDATABLE_FIELDS = (
+    "name",
+    "description",
+    "keyword_filter",
+    "min_relevance",
+    "frequency",
+    "max_hits",
+    "status",
+    "request_delay",
+    "concurrency",
+    "max_depth",
+    "scope",
+    "include_subdomains",
+    "respect_robots",
+    "options",
+)
+
+# Settings that decide which pages get stored; changing them invalidates the
+# source's ETag/Last-Modified cache so rejected pages aren't skipped on a 304
+FILTER_FIELDS = ("keyword_filter", "min_relevance")
+
+# Which discovered links a crawl follows, see url_utils.in_scope
+CRAWL_SCOPES = ("domain", "path", "any")
+
 
 def _oid(x: str):
     try:
@@ -12,103 +50,105 @@ def _oid(x: str):
         return None
 
 
+def _number(name: str, value, integer=False, minimum=0):
+    """A numeric option from a request (None when unset); 400 if invalid"""
+    if value is None or value == "":
+        return None
+    try:
+        # float(True) would pass as 1.0
+        number = float(value) if not isinstance(value, bool) else None
+    except (TypeError, ValueError):
+        number = None
+    kind = "an integer" if integer else "a number"
+    if number is None or (integer and not number.is_integer()):
+        raise HTTPException(status_code=400, detail=f"{name} must be {kind}")
+    if not math.isfinite(number) or number < minimum:
+        raise HTTPException(status_code=400, detail=f"{name} must be {kind} of at least {minimum}")
+    return int(number) if integer else number
+
+
+# Numeric crawl options: (integer, minimum)
+NUMERIC_FIELDS = {
+    "min_relevance": (False, 0),
+    "request_delay": (False, 0),
+    "concurrency": (True, 1),
+    "max_depth": (True, 0),
+    "frequency": (True, 0),
+}
+
+
+def _check_numbers(fields: dict):
+    """Convert NUMERIC_FIELDS, at top level or under options, in place"""
+    options = fields.get("options")
+    for container in (fields, options if isinstance(options, dict) else {}):
+        for name, (integer, minimum) in NUMERIC_FIELDS.items():
+            if name in container:
+                container[name] = _number(name, container[name], integer, minimum)
+
+
+def _run_progress(last_run: dict, running: bool):
+    """(items stored by the latest run, seconds it has been running, items per second)"""
+    crawled = last_run.get("crawled_count", 0)
+    runtime_seconds = None
+    rate = None
+    if running and last_run.get("started_at"):
+        runtime_seconds = (datetime.now() - last_run["started_at"]).total_seconds()
+        rate = crawled / runtime_seconds if runtime_seconds > 0 else None
+    return crawled, runtime_seconds, rate
+
+
+def _cached_json(key: tuple, compute):
+    """Encoded JSON of `await compute()` through the shared response cache"""
+    async def encoded():
+        return JSONResponse(jsonable_encoder(await compute()))
+    return response_cache.get(key, encoded)
+
+
 @router.get("/sources")
-def list_sources(request: Request):
-    db = request.app.state.db
-    runner = request.app.state.runner
+async def list_sources(request: Request):
+    # Every open dashboard polls the same list; see ResponseCache
+    return await _cached_json(("sources", None), lambda: _list_sources(request))
+
+
+async def _list_sources(request: Request):
+    db = request.app.state.async_db
+    # Item totals and the latest run are kept on each source document by the
+    # runner and the writer, so this is one query however many sources exist
+    runtime = request.app.state.runner.snapshot()
 
-    sources_raw = list(db.sources.find().sort("created_at", -1))
     sources = []
-    for s_raw in sources_raw:
-        # Convert MongoDB document to regular dict
-        s = dict(s_raw)
-        s["id"] = str(s["_id"])
-        source_id = s["id"]
-        s.pop("_id", None)
-        
-        # Add stats for each source
-        try:
-            total_pages = db.crawled_data.count_documents({"source_id": source_id})
-            last_run = db.crawl_runs.find_one(
-                {"source_id": source_id},
-                sort=[("started_at", -1)]
-            )
-            
-            running = runner.status(source_id)["running"]
-            
-            # Get current run's crawled count from database (real-time)
-            current_run_crawled = 0
-            runtime_seconds = None
-            rate = None
-            
-            if last_run:
-                run_id = str(last_run["_id"]) if "_id" in last_run else None
-                # Count actual documents crawled in this run for real-time stats
-                if run_id:
-                    current_run_crawled = db.crawled_data.count_documents({"run_id": run_id})
-                
-                # Calculate runtime if currently running
-                if running and last_run.get("started_at"):
-                    started_at = last_run["started_at"]
-                    # MongoDB datetime objects work directly with Python datetime
-                    runtime_seconds = (datetime.now() - started_at).total_seconds()
-                    # Calculate rate (pages per second)
-                    rate = current_run_crawled / runtime_seconds if runtime_seconds > 0 else None
-                else:
-                    # Use the stored crawled_count for finished runs
-                    current_run_crawled = last_run.get("crawled_count", current_run_crawled)
-            
-            # Add stats object that frontend expects
-            s["stats"] = {
-                "pages": total_pages,
-                "pages_crawled": current_run_crawled,
-                "documents": current_run_crawled,  # Alias for compatibility
-                "queued": 0,  # Could be calculated if queue is tracked
-                "errors": 0,  # Could be tracked if errors are stored
-                "rate": rate,
-                "pages_per_min": rate * 60 if rate else None,  # Convert to pages per minute
-                "throughput": rate,
-                "uptime": runtime_seconds,
-                "runtime_seconds": runtime_seconds,
-            }
-        except Exception as e:
-            # Fallback stats if there's an error
-            s["stats"] = {
-                "pages": 0,
-                "pages_crawled": 0,
-                "documents": 0,
-                "queued": 0,
-                "errors": 0,
-                "rate": None,
-                "pages_per_min": None,
-                "throughput": None,
-                "uptime": None,
-                "runtime_seconds": None,
-            }
-        
-        # Also add last_run info at top level for compatibility
-        try:
-            if last_run:
-                s["last_run"] = {
-                    "status": last_run.get("status"),
-                    "started_at": last_run.get("started_at"),
-                    "finished_at": last_run.get("finished_at"),
-                    "crawled_count": last_run.get("crawled_count", 0),
-                }
-        except:
-            pass
-        
+    async for s in db.sources.find().sort("created_at", -1):
+        s["id"] = str(s.pop("_id"))
+        status = runtime.get(s["id"], {"running": False, "queued": 0})
+        last_run = s.get("last_run") or {}
+        current_run_crawled, runtime_seconds, rate = _run_progress(last_run, status["running"])
+
+        # Add stats object that frontend expects
+        s["stats"] = {
+            "pages": s.get("total_pages", 0),
+            "pages_crawled": current_run_crawled,
+            "documents": current_run_crawled,  # Alias for compatibility
+            "queued": status["queued"],  # Position in the shared run queue, 0 if not waiting
+            "errors": 0,  # Could be tracked if errors are stored
+            "rate": rate,
+            "pages_per_min": rate * 60 if rate else None,  # Convert to pages per minute
+            "throughput": rate,
+            "uptime": runtime_seconds,
+            "runtime_seconds": runtime_seconds,
+        }
+        if not last_run:
+            s.pop("last_run", None)
         sources.append(s)
 
     return sources
 
 
 @router.post("/sources")
-def create_source(
+async def create_source(
     request: Request,
     payload: dict = Body(...)
 ):
-    db = request.app.state.db
+    db = request.app.state.async_db
 
     url = payload.get("url")
     name = payload.get("name")
@@ -128,86 +168,125 @@ def create_source(
         "source_type": source_type,
         "description": payload.get("description"),
         "keyword_filter": keyword_filter,
+        "min_relevance": payload.get("min_relevance"),
         "frequency": payload.get("frequency"),
         "max_hits": payload.get("max_hits", 50),
         "status": payload.get("status", "active"),  # Can be "active" or "inactive"
         "created_at": datetime.now(),
         "last_crawled": None,
         "crawl_count": 0,
+        "total_pages": 0,
         "runtime_status": "idle",
         "request_delay": payload.get("request_delay", 0),
+        "concurrency": payload.get("concurrency", Config.DEFAULT_CONCURRENCY),
+        "max_depth": payload.get("max_depth", Config.DEFAULT_MAX_DEPTH),
+        "scope": payload.get("scope", "domain"),
+        "include_subdomains": payload.get("include_subdomains", True),
+        "respect_robots": payload.get("respect_robots", True),
+        "options": payload.get("options") or {},
     }
+    if doc["scope"] not in CRAWL_SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(CRAWL_SCOPES)}")
+    _check_numbers(doc)
 
     try:
-        inserted = db.sources.insert_one(doc)
+        inserted = await db.sources.insert_one(doc)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to create source: {e}")
 
+    doc["next_run_at"] = await run_in_threadpool(request.app.state.scheduler.schedule, doc)
+
     doc["id"] = str(inserted.inserted_id)
     doc.pop("_id", None)
+    response_cache.invalidate(doc["id"])
 
     return doc
 
 
+@router.put("/sources/{source_id}")
+@router.patch("/sources/{source_id}")
+async def update_source(
+    source_id: str,
+    request: Request,
+    payload: dict = Body(...)
+):
+    db = request.app.state.async_db
+
+    oid = _oid(source_id)
+    if not oid:
+        raise HTTPException(status_code=400, detail="Invalid source id")
+
+    updates = {k: payload[k] for k in UPDATABLE_FIELDS if k in payload}
+    if not updates:
+        raise HTTPException(status_code=400, detail="No updatable fields provided")
+    if "scope" in updates and updates["scope"] not in CRAWL_SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(CRAWL_SCOPES)}")
+    _check_numbers(updates)
+
+    source = await db.sources.find_one_and_update(
+        {"_id": oid},
+        {"$set": updates},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not source:
+        raise HTTPException(status_code=404, detail="Source not found")
+
+    options = updates.get("options") or {}
+    if any(k in updates or k in options for k in FILTER_FIELDS):
+        await db.http_cache.delete_many({"source_id": source_id})
+
+    if "frequency" in updates or "status" in updates:
+        source["next_run_at"] = await run_in_threadpool(request.app.state.scheduler.schedule, source)
+    response_cache.invalidate(source_id)
+
+    source["id"] = str(source["_id"])
+    source.pop("_id", None)
+    return source
+
+
 @router.post("/sources/{source_id}/start")
-def start_source(source_id: str, request: Request):
+async def start_source(source_id: str, request: Request, priority: int = PRIORITY_MANUAL):
     runner = request.app.state.runner
 
-    run_id, err = runner.start(source_id)
+    if not _oid(source_id):
+        raise HTTPException(status_code=400, detail="Invalid source id")
+
+    # The runner and the scheduler keep the blocking client of the crawl threads
+    run_id, err = await run_in_threadpool(runner.start, source_id, priority=priority)
     if err:
         raise HTTPException(status_code=400, detail=err)
 
-    return {"run_id": run_id}
+    return {"run_id": run_id, **runner.status(source_id)}
 
 
 @router.post("/sources/{source_id}/stop")
-def stop_source(source_id: str, request: Request):
+async def stop_source(source_id: str, request: Request):
     runner = request.app.state.runner
 
-    runner.stop(source_id)
+    await run_in_threadpool(runner.stop, source_id)
     return {"ok": True}
 
 
 @router.get("/sources/{source_id}/stats")
-def source_stats(source_id: str, request: Request):
-    db = request.app.state.db
-    runner = request.app.state.runner
-
+async def source_stats(source_id: str, request: Request):
     oid = _oid(source_id)
     if not oid:
         raise HTTPException(status_code=400, detail="Invalid source id")
+    return await _cached_json(("source_stats", source_id), lambda: _source_stats(source_id, oid, request))
+
+
+async def _source_stats(source_id: str, oid: ObjectId, request: Request):
+    db = request.app.state.async_db
+    runner = request.app.state.runner
 
-    source = db.sources.find_one({"_id": oid})
+    source = await db.sources.find_one({"_id": oid})
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
 
-    total_pages = db.crawled_data.count_documents({"source_id": source_id})
-    last_run = db.crawl_runs.find_one(
-        {"source_id": source_id},
-        sort=[("started_at", -1)]
-    )
-
-    running = runner.status(source_id)["running"]
-    
-    # Get real-time crawled count for current run
-    current_run_crawled = 0
-    runtime_seconds = None
-    rate = None
-    
-    if last_run:
-        run_id = str(last_run["_id"]) if "_id" in last_run else None
-        # Count actual documents crawled in this run for real-time stats
-        if run_id:
-            current_run_crawled = db.crawled_data.count_documents({"run_id": run_id})
-        
-        # Calculate runtime if currently running
-        if running and last_run.get("started_at"):
-            started_at = last_run["started_at"]
-            runtime_seconds = (datetime.now() - started_at).total_seconds()
-            rate = current_run_crawled / runtime_seconds if runtime_seconds > 0 else None
-        else:
-            # Use stored count for finished runs
-            current_run_crawled = last_run.get("crawled_count", current_run_crawled)
+    runtime = runner.status(source_id)
+    running = runtime["running"]
+    last_run = source.get("last_run") or {}
+    current_run_crawled, runtime_seconds, rate = _run_progress(last_run, running)
 
     return {
         "source_id": source_id,
@@ -215,29 +294,71 @@ def source_stats(source_id: str, request: Request):
         "url": source.get("url"),
         "runtime_status": source.get("runtime_status", "idle"),
         "running": running,
-        "total_pages": total_pages,
+        "queued": runtime["queued"],
+        "total_pages": source.get("total_pages", 0),
         "last_crawled": source.get("last_crawled"),
         "crawl_count": source.get("crawl_count", 0),
         "current_run_crawled": current_run_crawled,
         "runtime_seconds": runtime_seconds,
         "rate": rate,
         "last_run": {
-            "status": last_run.get("status") if last_run else None,
-            "started_at": last_run.get("started_at") if last_run else None,
-            "finished_at": last_run.get("finished_at") if last_run else None,
-            "crawled_count": current_run_crawled,  # Return real-time count
+            "status": last_run.get("status"),
+            "started_at": last_run.get("started_at"),
+            "finished_at": last_run.get("finished_at"),
+            "crawled_count": current_run_crawled,
+            "new_count": last_run.get("new_count", 0),
+            "updated_count": last_run.get("updated_count", 0),
+            "unchanged_count": last_run.get("unchanged_count", 0),
         },
     }
 
 
+@router.get("/events")
+async def stream_events(request: Request):
+    """Server-Sent Events: queued, started, progress, stopping, error and finished runs"""
+    last_event_id = request.headers.get("Last-Event-ID")
+    queue = events.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=Config.EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if not events.is_subscribed(queue):
+                        break  # Dropped for falling behind; the client reconnects
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+                if queue.empty() and not events.is_subscribed(queue):
+                    break
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/scheduler")
+async def scheduler_stats(request: Request):
+    runner = request.app.state.runner
+    scheduler = request.app.state.scheduler
+    return {**runner.stats(), "periodic": scheduler.stats(), "response_cache": response_cache.stats()}
+
+
 @router.get("/runs")
-def list_runs(request: Request, limit: int = 50):
-    db = request.app.state.db
+async def list_runs(request: Request, limit: int = 50):
+    db = request.app.state.async_db
 
-    runs = list(
+    runs = await (
         db.crawl_runs.find()
         .sort("started_at", -1)
         .limit(limit)
+        .to_list()
     )
 
     for r in runs:
@@ -245,3 +366,191 @@ def list_runs(request: Request, limit: int = 50):
         r.pop("_id", None)
 
     return runs
+
+
+async def _aggregate(collection, pipeline: list):
+    return await (await collection.aggregate(pipeline)).to_list()
+
+
+@router.get("/analytics/throughput")
+async def analytics_throughput(
+    request: Request,
+    source_id: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    bucket: str = "hour",
+):
+    """Items stored per source and hour (or day), from crawl_stats_hourly"""
+    if bucket not in analytics.BUCKETS:
+        raise HTTPException(status_code=400, detail="bucket must be hour or day")
+    db = request.app.state.async_db
+    match = analytics.stats_match(source_id, since, until)
+    return await _aggregate(db.crawl_stats_hourly, analytics.throughput_pipeline(match, bucket))
+
+
+@router.get("/analytics/runs")
+async def analytics_runs(request: Request, source_id: str = None, since: datetime = None, until: datetime = None):
+    """Share of finished, failed and stopped runs and p50/p95 run duration"""
+    db = request.app.state.async_db
+    match = analytics.stats_match(source_id, since, until)
+    outcomes, durations = await asyncio.gather(
+        _aggregate(db.crawl_stats_hourly, analytics.outcomes_pipeline(match)),
+        _aggregate(db.crawl_stats_hourly, analytics.durations_pipeline(match)),
+    )
+    counts = outcomes[0] if outcomes else {status: 0 for status in analytics.RUN_OUTCOMES}
+    total = sum(counts.values())
+    durations = durations[0] if durations else {}
+    return {
+        "runs": total,
+        **counts,
+        "ratios": {status: counts[status] / total if total else None for status in analytics.RUN_OUTCOMES},
+        "duration_seconds": {"p50": durations.get("p50"), "p95": durations.get("p95")},
+    }
+
+
+@router.get("/analytics/items")
+async def analytics_items(request: Request, source_id: str = None, since: datetime = None, until: datetime = None):
+    """Items stored per content_type and per keyword filter"""
+    db = request.app.state.async_db
+    match = analytics.stats_match(source_id, since, until)
+    by_content_type, by_keyword_filter = await asyncio.gather(
+        _aggregate(db.crawl_stats_hourly, analytics.breakdown_pipeline(match, "content_type")),
+        _aggregate(db.crawl_stats_hourly, analytics.breakdown_pipeline(match, "keyword_filter")),
+    )
+    return {"by_content_type": by_content_type, "by_keyword_filter": by_keyword_filter}
+
+
+@router.get("/data")
+async def list_data(
+    request: Request,
+    source_id: str = None,
+    run_id: str = None,
+    content_type: str = None,
+    keyword_filter: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    q: str = None,
+    sort: str = "recent",
+    fields: str = None,
+    limit: int = 50,
+    cursor: str = None,
+):
+    """Crawled items, newest first, one page at a time.
+
+    Pages are keyset-paginated on (crawled_at, _id): pass `next_cursor` back
+    as `cursor`. `q` is a full-text search; with sort=relevance results are
+    ordered by text score and the cursor is an offset instead (up to
+    Config.MAX_RELEVANCE_OFFSET). `fields` is a comma separated projection.
+    """
+    db = request.app.state.async_db
+    limit = max(1, min(limit, Config.MAX_PAGE_SIZE))
+    if sort not in ("recent", "relevance"):
+        raise HTTPException(status_code=400, detail="sort must be recent or relevance")
+    by_relevance = sort == "relevance" and bool(q)
+
+    query = data_query.build_filter(source_id, run_id, content_type, keyword_filter, since, until, q)
+    proj = data_query.projection(fields, with_score=bool(q))
+    proj["crawled_at"] = 1  # Needed for the cursor
+
+    try:
+        if by_relevance:
+            offset = int(data_query.decode_cursor(cursor)["o"]) if cursor else 0
+            if offset > Config.MAX_RELEVANCE_OFFSET:
+                raise data_query.InvalidCursor("Relevance results end here; narrow the search")
+            docs = await (
+                db.crawled_data.find(query, proj)
+                .sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+                .skip(offset)
+                .limit(limit + 1)
+                .to_list()
+            )
+        else:
+            if cursor:
+                query = data_query.after_cursor(query, cursor)
+            docs = await (
+                db.crawled_data.find(query, proj)
+                .sort([("crawled_at", -1), ("_id", -1)])
+                .limit(limit + 1)
+                .to_list()
+            )
+    except (data_query.InvalidCursor, KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e) or "Invalid cursor")
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = None
+    if has_more:
+        if by_relevance:
+            next_cursor = data_query.encode_cursor({"o": offset + limit})
+        else:
+            next_cursor = data_query.cursor_after(docs[-1])
+
+    for d in docs:
+        d["id"] = str(d.pop("_id"))
+
+    return {"items": docs, "count": len(docs), "next_cursor": next_cursor}
+
+
+def _export_response(db, query: dict, name: str, format: str, fields: str, gzip: bool):
+    if format not in exporter.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exporter.FORMATS)}")
+    if format not in exporter.available_formats():
+        raise HTTPException(status_code=400, detail=f"{format} export needs pyarrow installed on the server")
+
+    names = tuple(f.strip() for f in fields.split(",") if f.strip() not in ("", "id", "_id")) if fields else None
+    media_type, extension = exporter.FORMATS[format]
+    filename = f"{name}.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        exporter.export_stream(db.crawled_data, query, format, names, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/runs/{run_id}/export")
+async def export_run(run_id: str, request: Request, format: str = "ndjson", fields: str = None, gzip: bool = False):
+    """Download the items stored or updated by one run"""
+    db = request.app.state.async_db
+    if not await db.crawl_runs.find_one({"_id": _oid(run_id)}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Run not found")
+    query = data_query.build_filter(run_id=run_id)
+    return _export_response(db, query, f"run-{run_id}", format, fields, gzip)
+
+
+@router.get("/sources/{source_id}/export")
+async def export_source(
+    source_id: str,
+    request: Request,
+    format: str = "ndjson",
+    fields: str = None,
+    gzip: bool = False,
+    since: datetime = None,
+    until: datetime = None,
+):
+    """Download every item of a source, optionally within a crawled_at range"""
+    db = request.app.state.async_db
+    if not await db.sources.find_one({"_id": _oid(source_id)}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Source not found")
+    query = data_query.build_filter(source_id=source_id, since=since, until=until)
+    return _export_response(db, query, f"source-{source_id}", format, fields, gzip)
+
+
+@router.get("/export")
+async def export_data(
+    request: Request,
+    format: str = "ndjson",
+    fields: str = None,
+    gzip: bool = False,
+    since: datetime = None,
+    until: datetime = None,
+    source_id: str = None,
+    content_type: str = None,
+    keyword_filter: str = None,
+    q: str = None,
+):
+    """Download crawled items across sources, filtered like GET /api/data"""
+    db = request.app.state.async_db
+    query = data_query.build_filter(source_id, None, content_type, keyword_filter, since, until, q)
+    return _export_response(db, query, "crawled-data", format, fields, gzip)
@@ -12,5 +12,127 @@ class Config:
     MAX_RETRIES = 3
     RETRY_DELAY = 2
 
+    # Retries back off exponentially from RETRY_DELAY with full jitter, up to
+    # RETRY_MAX_DELAY; a Retry-After of up to MAX_RETRY_AFTER seconds is
+    # honored. After BREAKER_THRESHOLD consecutive failures a host is left
+    # alone for BREAKER_COOLDOWN seconds (doubling while it keeps failing).
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+    MAX_RETRY_AFTER = float(os.getenv("MAX_RETRY_AFTER", "120"))
+    BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "5"))
+    BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+    # Bodies are streamed in FETCH_CHUNK_SIZE chunks and capped per detected type
+    FETCH_CHUNK_SIZE = 64 * 1024
+    MAX_BODY_BYTES = {
+        "html": int(os.getenv("MAX_HTML_BYTES", str(5 * 1024 * 1024))),
+        "xml": int(os.getenv("MAX_XML_BYTES", str(5 * 1024 * 1024))),
+        "rss": int(os.getenv("MAX_RSS_BYTES", str(10 * 1024 * 1024))),
+        "txt": int(os.getenv("MAX_TXT_BYTES", str(1 * 1024 * 1024))),
+        "pdf": int(os.getenv("MAX_PDF_BYTES", str(25 * 1024 * 1024))),
+    }
+
     DEFAULT_MAX_HITS = 50
+    # Link depth followed from the seed page (1 = only pages linked from it),
+    # and the most URLs a run keeps queued before it stops adding links
+    DEFAULT_MAX_DEPTH = int(os.getenv("DEFAULT_MAX_DEPTH", "1"))
+    MAX_FRONTIER_SIZE = int(os.getenv("MAX_FRONTIER_SIZE", "10000"))
+    # Skip leaf pages a source already fetched in the last SEEN_URLS_TTL
+    # seconds (per source with the `skip_seen` option)
+    SKIP_SEEN_URLS = os.getenv("SKIP_SEEN_URLS", "false").lower() == "true"
+    SEEN_URLS_TTL = int(os.getenv("SEEN_URLS_TTL", str(7 * 24 * 3600)))
     DEFAULT_FREQUENCY = 3600
+
+    # Periodic scheduling: shortest allowed frequency (seconds) and the random
+    # delay added to each due time, as a fraction of the frequency
+    MIN_FREQUENCY = int(os.getenv("MIN_FREQUENCY", "60"))
+    SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", "0.1"))
+
+    # Minimum keyword relevance score for a filtered item to be stored
+    # (1 = at least one keyword); sources can override it with `min_relevance`
+    MIN_RELEVANCE = float(os.getenv("MIN_RELEVANCE", "1"))
+
+    # Upper bound on entries kept from a single feed (0 = no limit)
+    MAX_FEED_ITEMS = int(os.getenv("MAX_FEED_ITEMS", "500")) or None
+
+    # Per-source fetch concurrency (requests in flight for one run)
+    DEFAULT_CONCURRENCY = 3
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "16"))
+
+    # HTML extraction backend: "auto" (selectolax, then lxml, when installed),
+    # "bs4", "lxml" or "selectolax"
+    HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+    # Parsing runs on a shared process pool of PARSE_WORKERS processes
+    # (0 = parse inline on the crawl thread). A run stops fetching once
+    # concurrency * PARSE_BACKLOG_FACTOR bodies are fetched but not parsed.
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+    PARSE_BACKLOG_FACTOR = int(os.getenv("PARSE_BACKLOG_FACTOR", "2"))
+
+    # PDFs: only the first PDF_MAX_PAGES pages are read, and extraction gives
+    # up after PDF_TIME_BUDGET seconds keeping the text so far. A worker still
+    # busy after twice the budget in CPU time is killed and replaced. PDFs are
+    # parsed on their own pool of PDF_WORKERS processes.
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+    PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", "15"))
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+
+    # Crawled documents are written in batches of WRITE_BATCH_SIZE, or after
+    # WRITE_FLUSH_INTERVAL seconds, whichever comes first
+    WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "100"))
+    WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "2"))
+    # A batch that fails on a database error is retried this many times,
+    # RETRY_DELAY * 2^attempt seconds apart, before the run gives up
+    WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", "3"))
+
+    # Send If-None-Match / If-Modified-Since from validators of earlier runs
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+
+    # Connection pools shared by all runs: keep-alive pools for up to
+    # HTTP_POOL_HOSTS hosts of HTTP_POOL_SIZE connections each (a request
+    # waits when its host's pool is busy). Resolved addresses are cached for
+    # DNS_CACHE_TTL seconds (0 disables the cache).
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "100"))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+    DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+
+    # Politeness, shared by all runs: at most HOST_BURST back-to-back requests
+    # per host, then one per MIN_HOST_DELAY seconds. A larger source
+    # request_delay or site Crawl-delay (capped at MAX_CRAWL_DELAY) is kept
+    # between every two requests, with no burst. robots.txt is re-read after ROBOTS_TTL seconds.
+    MIN_HOST_DELAY = float(os.getenv("MIN_HOST_DELAY", "0.1"))
+    HOST_BURST = int(os.getenv("HOST_BURST", "2"))
+    MAX_CRAWL_DELAY = float(os.getenv("MAX_CRAWL_DELAY", "30"))
+    ROBOTS_TTL = int(os.getenv("ROBOTS_TTL", "3600"))
+
+    # GET /api/data: largest page, and how deep relevance-sorted search
+    # results can be paged (they use an offset rather than a keyset cursor)
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+    MAX_RELEVANCE_OFFSET = int(os.getenv("MAX_RELEVANCE_OFFSET", "5000"))
+
+    # GET /api/events: progress is sent at most every EVENT_PROGRESS_INTERVAL
+    # seconds per source; a client more than EVENT_QUEUE_SIZE events behind is
+    # disconnected, and idle streams get a keep-alive every EVENT_KEEPALIVE s.
+    EVENT_PROGRESS_INTERVAL = float(os.getenv("EVENT_PROGRESS_INTERVAL", "1"))
+    EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "1000"))
+    EVENT_KEEPALIVE = float(os.getenv("EVENT_KEEPALIVE", "15"))
+
+    # Exports read the cursor and write Parquet row groups EXPORT_BATCH_SIZE
+    # documents at a time
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Connections of the async MongoDB client the API handlers share
+    API_MONGO_POOL_SIZE = int(os.getenv("API_MONGO_POOL_SIZE", "100"))
+
+    # GET /api/sources and /api/sources/{id}/stats are cached this many
+    # seconds (0: identical concurrent requests are still computed once)
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "2"))
+
+    # crawl_stats_hourly is refreshed every STATS_ROLLUP_INTERVAL seconds; the
+    # first roll-up goes back STATS_BACKFILL_DAYS. Analytics endpoints cover
+    # the last ANALYTICS_DEFAULT_DAYS unless a range is given.
+    STATS_ROLLUP_INTERVAL = int(os.getenv("STATS_ROLLUP_INTERVAL", "300"))
+    STATS_BACKFILL_DAYS = int(os.getenv("STATS_BACKFILL_DAYS", "30"))
+    ANALYTICS_DEFAULT_DAYS = int(os.getenv("ANALYTICS_DEFAULT_DAYS", "7"))
+
+    # Shared worker pool: how many source runs may crawl at the same time
+    MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "8"))
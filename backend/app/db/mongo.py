@@ -1,7 +1,8 @@
-from pymongo import MongoClient, ASCENDING, TEXT
+from pymongo import AsyncMongoClient, MongoClient, ASCENDING, DESCENDING, TEXT
 from app.core.config import Config
 
 _client = None
+_async_client = None
 
 def get_db():
     global _client
@@ -10,21 +11,92 @@ def get_db():
         _client.server_info()
     return _client[Config.DATABASE_NAME]
 
+def get_async_db():
+    """Database on the asyncio client used by the API handlers; crawl threads use get_db()"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(
+            Config.MONGODB_URI,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=Config.API_MONGO_POOL_SIZE,
+        )
+    return _async_client[Config.DATABASE_NAME]
+
+async def close_async_db():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
 def ensure_indexes():
     db = get_db()
     sources = db.sources
     crawled_data = db.crawled_data
     crawl_runs = db.crawl_runs
+    http_cache = db.http_cache
+    seen_urls = db.seen_urls
+    crawl_stats_hourly = db.crawl_stats_hourly
 
     sources.create_index([("url", ASCENDING)], unique=True)
     sources.create_index([("status", ASCENDING)])
 
     crawled_data.create_index([("source_id", ASCENDING)])
+    # Dedup key; documents stored before url_hash existed are left out
+    crawled_data.create_index(
+        [("source_id", ASCENDING), ("url_hash", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"url_hash": {"$exists": True}},
+    )
+    # GET /api/data pages newest first on (crawled_at, _id), optionally after
+    # an equality filter on one of these fields
+    crawled_data.create_index([("crawled_at", DESCENDING), ("_id", DESCENDING)])
+    for field in ("source_id", "run_id", "content_type", "keyword_filter"):
+        crawled_data.create_index([(field, ASCENDING), ("crawled_at", DESCENDING), ("_id", DESCENDING)])
     crawled_data.create_index([("source_url", ASCENDING)])
     crawled_data.create_index([("crawled_at", ASCENDING)])
+    # Hour an item is counted in by the analytics roll-up
+    crawled_data.create_index([("first_crawled_at", ASCENDING)])
     crawled_data.create_index([("content_type", ASCENDING)])
+    crawled_data.create_index([("relevance.score", ASCENDING)])
 
     crawled_data.create_index([("title", TEXT), ("content", TEXT), ("url", TEXT)])
 
     crawl_runs.create_index([("source_id", ASCENDING)])
     crawl_runs.create_index([("started_at", ASCENDING)])
+    crawl_runs.create_index([("finished_at", ASCENDING)])
+
+    # Validators are per source: two sources can crawl the same URL with
+    # different filters. The earlier global url_hash key is replaced.
+    if "url_hash_1" in http_cache.index_information():
+        http_cache.drop_index("url_hash_1")
+    http_cache.create_index([("source_id", ASCENDING), ("url_hash", ASCENDING)], unique=True)
+
+    seen_urls.create_index([("source_id", ASCENDING), ("expires_at", ASCENDING)])
+    # Expire each run's fingerprints at their own expires_at
+    seen_urls.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+    crawl_stats_hourly.create_index([("source_id", ASCENDING), ("hour", ASCENDING)], unique=True)
+    crawl_stats_hourly.create_index([("hour", ASCENDING)])
+    crawl_stats_hourly.create_index([("complete", ASCENDING), ("hour", DESCENDING)])
+
+
+def backfill_source_stats():
+    """Compute total_pages and last_run once for sources created before they were maintained"""
+    db = get_db()
+    for source in db.sources.find({"total_pages": {"$exists": False}}, {"_id": 1}):
+        source_id = str(source["_id"])
+        updates = {"total_pages": db.crawled_data.count_documents({"source_id": source_id})}
+        run = db.crawl_runs.find_one({"source_id": source_id}, sort=[("queued_at", DESCENDING), ("started_at", DESCENDING)])
+        if run:
+            updates["last_run"] = {
+                "run_id": str(run["_id"]),
+                "status": run.get("status"),
+                "queued_at": run.get("queued_at"),
+                "started_at": run.get("started_at"),
+                "finished_at": run.get("finished_at"),
+                "crawled_count": run.get("crawled_count", 0),
+                "new_count": run.get("new_count", 0),
+                "updated_count": run.get("updated_count", 0),
+                "unchanged_count": run.get("unchanged_count", 0),
+            }
+        db.sources.update_one({"_id": source["_id"]}, {"$set": updates})
@@ -3,9 +3,12 @@ import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.mongo import get_db, ensure_indexes
+from app.core.config import Config
+from app.db.mongo import get_db, get_async_db, close_async_db, ensure_indexes, backfill_source_stats
 from app.api.routes import router
+from app.services import analytics, parse_pool
 from app.services.runner import CrawlerRunner
+from app.services.scheduler import PeriodicScheduler
 
 app = FastAPI(title="Crawler Dashboard API")
 
@@ -18,33 +21,38 @@ app.add_middleware(
 )
 
 def cleanup_stuck_threads_periodically(runner, db):
-    """Background task to periodically clean up stuck threads"""
+    """Background task to periodically reset sources left in a running state"""
     while True:
         try:
             time.sleep(30)  # Check every 30 seconds
             runner.cleanup_stuck_threads()
-            
-            # Also check for sources marked as running but no active thread
-            from bson import ObjectId
-            stuck_sources = db.sources.find({"runtime_status": {"$in": ["running", "stopping"]}})
-            for source in stuck_sources:
-                source_id = str(source["_id"])
-                # Check if thread is actually alive
-                status = runner.status(source_id)
-                if not status["running"]:
-                    # Thread is dead, already cleaned up by status() method
-                    pass
         except Exception as e:
             print(f"Error in cleanup task: {e}")
 
+def roll_up_stats_periodically(db):
+    """Background task to keep crawl_stats_hourly current for the analytics endpoints"""
+    while True:
+        try:
+            analytics.roll_up(db)
+        except Exception as e:
+            print(f"Error rolling up crawl stats: {e}")
+        time.sleep(Config.STATS_ROLLUP_INTERVAL)
+
 @app.on_event("startup")
 def startup():
     db = get_db()
     ensure_indexes()
+    backfill_source_stats()
     runner = CrawlerRunner(db)
+    scheduler = PeriodicScheduler(db, runner)
 
     app.state.db = db
+    # Request handlers are async and use their own client; the runner and
+    # the scheduler keep the blocking one on their threads
+    app.state.async_db = get_async_db()
     app.state.runner = runner
+    app.state.scheduler = scheduler
+    scheduler.start()
     
     # Start background cleanup task
     cleanup_thread = threading.Thread(
@@ -54,8 +62,15 @@ def startup():
     )
     cleanup_thread.start()
 
+    threading.Thread(target=roll_up_stats_periodically, args=(db,), daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    parse_pool.shutdown()
+    await close_async_db()
+
 @app.get("/api/health")
-def health():
+async def health():
     return {"ok": True}
 
 app.include_router(router, prefix="/api")
@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne
+
+from app.core.config import Config
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+BUCKETS = {"hour": HOUR_MS, "day": DAY_MS}
+
+# Final statuses a run can end with, see CrawlerRunner._run
+RUN_OUTCOMES = ("finished", "failed", "stopped")
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Buffered items and finishing runs still land in an hour for a moment
+# after it ends; it is only marked complete once this much later
+_SETTLE = timedelta(minutes=5)
+
+
+def _truncate(field: str, bucket_ms: int = HOUR_MS):
+    """Expression for the start of the bucket holding a date field.
+
+    Plain date arithmetic (date - date is milliseconds) rather than
+    $dateTrunc, which needs MongoDB 5.0.
+    """
+    return {"$subtract": [field, {"$mod": [{"$subtract": [field, _EPOCH]}, bucket_ms]}]}
+
+
+def _percentile(array: str, count: str, p: float):
+    """Element p of an already sorted array (nearest rank)"""
+    return {"$arrayElemAt": [array, {"$toInt": {"$subtract": [{"$ceil": {"$multiply": [count, p]}}, 1]}}]}
+
+
+def roll_up(db, now: datetime = None):
+    """Fold crawled_data and crawl_runs into one crawl_stats_hourly document per source and hour.
+
+    Starts after the last hour that was complete at its previous roll-up
+    (or STATS_BACKFILL_DAYS ago) and goes up to now, so the current hour is
+    refreshed on every pass. Two aggregations over indexed time ranges do
+    the counting; analytics endpoints only read the result.
+
+    Items count in the hour they were first stored (`first_crawled_at`, set
+    once on insert). `crawled_at` moves forward each time a page is crawled
+    again, which would count it again in an hour that may already be
+    complete. Items stored before `first_crawled_at` existed fall back to
+    `crawled_at`.
+    """
+    now = now or datetime.now()
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    last = db.crawl_stats_hourly.find_one({"complete": True}, {"hour": 1}, sort=[("hour", -1)])
+    start = last["hour"] + timedelta(hours=1) if last else current_hour - timedelta(days=Config.STATS_BACKFILL_DAYS)
+
+    rows = {}
+
+    def row(source_id, hour):
+        key = (source_id, hour)
+        if key not in rows:
+            rows[key] = {
+                "source_id": source_id,
+                "hour": hour,
+                "complete": hour + timedelta(hours=1) + _SETTLE <= now,
+                "rolled_at": now,
+                "items": 0,
+                "content_types": {},
+                "keyword_filters": {},
+                "runs": {status: 0 for status in RUN_OUTCOMES},
+                "crawled": 0,
+                "run_durations": [],
+            }
+        return rows[key]
+
+    window = {"$gte": start, "$lt": now}
+    items = db.crawled_data.aggregate([
+        {"$match": {"$or": [
+            {"first_crawled_at": window},
+            {"first_crawled_at": {"$exists": False}, "crawled_at": window},
+        ]}},
+        {"$group": {
+            "_id": {
+                "source_id": "$source_id",
+                "hour": _truncate({"$ifNull": ["$first_crawled_at", "$crawled_at"]}),
+                "content_type": "$content_type",
+                "keyword_filter": "$keyword_filter",
+            },
+            "items": {"$sum": 1},
+        }},
+    ], allowDiskUse=True)
+    for group in items:
+        key = group["_id"]
+        r = row(key.get("source_id"), key["hour"])
+        r["items"] += group["items"]
+        content_type = key.get("content_type") or "unknown"
+        keyword_filter = key.get("keyword_filter") or "no_filter"
+        r["content_types"][content_type] = r["content_types"].get(content_type, 0) + group["items"]
+        r["keyword_filters"][keyword_filter] = r["keyword_filters"].get(keyword_filter, 0) + group["items"]
+
+    runs = db.crawl_runs.aggregate([
+        {"$match": {"finished_at": {"$gte": start, "$lt": now}, "status": {"$in": list(RUN_OUTCOMES)}}},
+        {"$group": {
+            "_id": {"source_id": "$source_id", "hour": _truncate("$finished_at"), "status": "$status"},
+            "runs": {"$sum": 1},
+            "crawled": {"$sum": {"$ifNull": ["$crawled_count", 0]}},
+            # Runs cancelled while queued never started and have no duration
+            "durations": {"$push": {"$cond": [
+                {"$ifNull": ["$started_at", False]},
+                {"$divide": [{"$subtract": ["$finished_at", "$started_at"]}, 1000]},
+                None,
+            ]}},
+        }},
+    ])
+    for group in runs:
+        key = group["_id"]
+        r = row(key.get("source_id"), key["hour"])
+        r["runs"][key["status"]] += group["runs"]
+        r["crawled"] += group["crawled"]
+        r["run_durations"] += [d for d in group["durations"] if d is not None]
+
+    requests = []
+    for r in rows.values():
+        # Lists rather than maps so the endpoints can $unwind them
+        r["content_types"] = [{"content_type": k, "items": v} for k, v in r["content_types"].items()]
+        r["keyword_filters"] = [{"keyword_filter": k, "items": v} for k, v in r["keyword_filters"].items()]
+        requests.append(ReplaceOne({"source_id": r["source_id"], "hour": r["hour"]}, r, upsert=True))
+    if requests:
+        db.crawl_stats_hourly.bulk_write(requests, ordered=False)
+    # Hours re-rolled this pass that no longer have any activity
+    db.crawl_stats_hourly.delete_many({"hour": {"$gte": start}, "rolled_at": {"$lt": now}})
+    return len(rows)
+
+
+def stats_match(source_id: str = None, since: datetime = None, until: datetime = None):
+    """Filter on crawl_stats_hourly; the last Config.ANALYTICS_DEFAULT_DAYS when no range is given"""
+    until = until or datetime.now()
+    since = since or until - timedelta(days=Config.ANALYTICS_DEFAULT_DAYS)
+    match = {"hour": {"$gte": since.replace(minute=0, second=0, microsecond=0), "$lt": until}}
+    if source_id:
+        match["source_id"] = source_id
+    return match
+
+
+def throughput_pipeline(match: dict, bucket: str = "hour"):
+    """Items stored per source and time bucket"""
+    bucket_ms = BUCKETS[bucket]
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"source_id": "$source_id", "bucket": _truncate("$hour", bucket_ms)},
+            "items": {"$sum": "$items"},
+            "crawled": {"$sum": "$crawled"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "source_id": "$_id.source_id",
+            "bucket": "$_id.bucket",
+            "items": 1,
+            "crawled": 1,
+            "items_per_minute": {"$divide": ["$items", bucket_ms / 60000]},
+        }},
+        {"$sort": {"bucket": 1, "source_id": 1}},
+    ]
+
+
+def outcomes_pipeline(match: dict):
+    """Runs per final status"""
+    return [
+        {"$match": match},
+        {"$group": {"_id": None, **{status: {"$sum": f"$runs.{status}"} for status in RUN_OUTCOMES}}},
+        {"$project": {"_id": 0}},
+    ]
+
+
+def durations_pipeline(match: dict):
+    """p50/p95 run duration in seconds"""
+    return [
+        {"$match": match},
+        {"$unwind": "$run_durations"},
+        {"$sort": {"run_durations": 1}},
+        {"$group": {"_id": None, "durations": {"$push": "$run_durations"}, "count": {"$sum": 1}}},
+        {"$project": {
+            "_id": 0,
+            "count": 1,
+            "p50": _percentile("$durations", "$count", 0.5),
+            "p95": _percentile("$durations", "$count", 0.95),
+        }},
+    ]
+
+
+def breakdown_pipeline(match: dict, field: str):
+    """Items per content_type or keyword_filter"""
+    array = {"content_type": "content_types", "keyword_filter": "keyword_filters"}[field]
+    return [
+        {"$match": match},
+        {"$unwind": f"${array}"},
+        {"$group": {"_id": f"${array}.{field}", "items": {"$sum": f"${array}.items"}}},
+        {"$project": {"_id": 0, field: "$_id", "items": 1}},
+        {"$sort": {"items": -1}},
+    ]
@@ -0,0 +1,168 @@
+import hashlib
+import time
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.core.config import Config
+from app.services.url_utils import url_fingerprint
+
+
+def content_fingerprint(doc: dict):
+    """Hash of the fields that make a stored item different from its last version"""
+    h = hashlib.sha1()
+    for field in ("title", "content", "published"):
+        h.update(str(doc.get(field) or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class BufferedWriter:
+    """Collects documents and upserts them with unordered `bulk_write`.
+
+    Documents are deduplicated across runs by source, normalized URL and a
+    content fingerprint: new URLs are inserted, changed content is updated in
+    place and unchanged items only get `last_seen` touched.
+
+    A batch is flushed once it reaches `batch_size` documents or is older
+    than `flush_interval` seconds. Callers must `close()` the writer when the
+    run ends (normally or on stop) so the last partial batch is written.
+
+    Documents whose URL can't be fingerprinted are logged and dropped in
+    `add`. A batch that fails on a database error is kept and retried up to
+    Config.WRITE_MAX_RETRIES times with backoff; after that the error is
+    raised and the batch dropped.
+    """
+
+    def __init__(self, collection, batch_size: int = None, flush_interval: float = None, on_flush=None):
+        self.collection = collection
+        self.batch_size = batch_size or Config.WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Config.WRITE_FLUSH_INTERVAL
+        self.on_flush = on_flush
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.counts = {"new": 0, "updated": 0, "unchanged": 0}
+        self.last_batch = dict(self.counts)
+        self._buffer = []
+        self._oldest = None
+        self._retries = 0
+        self._retry_at = 0
+
+    def add(self, doc: dict):
+        """Buffer a document; False if it was dropped"""
+        try:
+            doc["url_hash"] = url_fingerprint(doc["url"])
+        except (KeyError, TypeError, ValueError) as e:
+            # e.g. a feed item linking to http://host:99999/
+            print(f"Dropping document with unusable url {doc.get('url')!r}: {e}")
+            self.dropped += 1
+            return False
+        doc["content_hash"] = content_fingerprint(doc)
+        doc["last_seen"] = doc["crawled_at"]
+
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append(doc)
+        if len(self._buffer) >= self.batch_size and time.monotonic() >= self._retry_at:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return True
+
+    def flush_if_due(self):
+        now = time.monotonic()
+        if self._buffer and now - self._oldest >= self.flush_interval and now >= self._retry_at:
+            self.flush()
+
+    def _existing_hashes(self, keys):
+        """Current content hash per (source_id, url_hash) already stored"""
+        by_source = {}
+        for source_id, url_hash in keys:
+            by_source.setdefault(source_id, []).append(url_hash)
+
+        existing = {}
+        for source_id, url_hashes in by_source.items():
+            cursor = self.collection.find(
+                {"source_id": source_id, "url_hash": {"$in": url_hashes}},
+                {"url_hash": 1, "content_hash": 1},
+            )
+            for d in cursor:
+                existing[(source_id, d["url_hash"])] = d.get("content_hash")
+        return existing
+
+    def _build_ops(self, batch):
+        # The same URL can show up twice in one batch; the last version wins
+        latest = {}
+        for doc in batch:
+            latest[(doc["source_id"], doc["url_hash"])] = doc
+
+        existing = self._existing_hashes(latest)
+        counts = {"new": 0, "updated": 0, "unchanged": len(batch) - len(latest)}
+        ops = []
+        for (source_id, url_hash), doc in latest.items():
+            key_filter = {"source_id": source_id, "url_hash": url_hash}
+            if (source_id, url_hash) not in existing:
+                counts["new"] += 1
+                ops.append(UpdateOne(
+                    key_filter,
+                    {"$set": doc, "$setOnInsert": {"first_crawled_at": doc["crawled_at"]}},
+                    upsert=True,
+                ))
+            elif existing[(source_id, url_hash)] == doc["content_hash"]:
+                counts["unchanged"] += 1
+                ops.append(UpdateOne(
+                    key_filter,
+                    {"$set": {"last_seen": doc["last_seen"], "last_seen_run_id": doc["run_id"]}},
+                ))
+            else:
+                counts["updated"] += 1
+                ops.append(UpdateOne(key_filter, {"$set": doc}))
+        return ops, counts
+
+    def flush(self):
+        if not self._buffer:
+            return 0
+
+        batch, self._buffer = self._buffer, []
+        try:
+            ops, counts = self._build_ops(batch)
+            self.collection.bulk_write(ops, ordered=False)
+            failed = 0
+        except BulkWriteError as e:
+            # Unordered: everything except the failing operations was applied
+            failed = len(e.details.get("writeErrors", []))
+            print(f"Bulk write partially failed ({failed} of {len(ops)}): {e.details.get('writeErrors', [])[:1]}")
+        except PyMongoError as e:
+            # Nothing was acknowledged (network error, failover...)
+            if self._retries < Config.WRITE_MAX_RETRIES:
+                delay = Config.RETRY_DELAY * 2 ** self._retries
+                self._retries += 1
+                print(f"Bulk write failed, retrying in {delay}s ({self._retries}/{Config.WRITE_MAX_RETRIES}): {e}")
+                self._buffer = batch + self._buffer
+                self._retry_at = time.monotonic() + delay
+                return 0
+            self._retries = 0
+            self.failed += len(batch)
+            raise
+
+        self._retries = 0
+        self._retry_at = 0
+        self.last_batch = counts
+        for k, v in counts.items():
+            self.counts[k] += v
+        self.written += len(batch) - failed
+        self.failed += failed
+        if self.on_flush:
+            try:
+                self.on_flush(self)
+            except Exception as e:
+                print(f"Error reporting flush progress: {e}")
+        return len(batch) - failed
+
+    def close(self):
+        written = 0
+        while self._buffer:
+            # Waits out the backoff of a batch being retried
+            time.sleep(max(0, self._retry_at - time.monotonic()))
+            written += self.flush()
+        return written
@@ -3,63 +3,206 @@ from urllib.parse import urljoin, urlparse
 import feedparser
 from PyPDF2 import PdfReader
 import io
+import itertools
+import re
+import time
+
+from app.core.config import Config
+
+# Optional C-based HTML backends; BeautifulSoup is used when neither is installed
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        # selectolax < 0.3.13 only ships the Modest backend
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+MAX_CONTENT_CHARS = 5000
+MAX_LINKS = 50
+_SKIPPED_TAGS = ("script", "style", "nav", "footer")
+# lxml refuses str input that still carries its encoding declaration (XHTML)
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+class PdfBudgetExceeded(Exception):
+    """Raised by a timer to abandon a PDF page that takes too long"""
+
+
+def _join_until(strings, limit=MAX_CONTENT_CHARS):
+    """Join stripped, non-empty strings with spaces, stopping once limit is reached"""
+    parts = []
+    size = 0
+    for s in strings:
+        s = s.strip()
+        if not s:
+            continue
+        parts.append(s)
+        size += len(s) + 1
+        if size >= limit:
+            break
+    return " ".join(parts)[:limit]
+
+
+def _absolute_links(url, hrefs, limit=MAX_LINKS):
+    return [urljoin(url, href) for href in itertools.islice(hrefs, limit)]
+
+
+def available_html_backends():
+    backends = ["bs4"]
+    if lxml_html is not None:
+        backends.append("lxml")
+    if SelectolaxParser is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def _resolve_backend(name):
+    if name == "auto":
+        if SelectolaxParser is not None:
+            return "selectolax"
+        if lxml_html is not None:
+            return "lxml"
+        return "bs4"
+    if name not in available_html_backends():
+        print(f"HTML parser backend '{name}' is not installed, using bs4")
+        return "bs4"
+    return name
+
 
 class ContentParser:
     @staticmethod
-    def parse_html(content: str, url: str):
-        soup = BeautifulSoup(content, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer"]):
-            tag.decompose()
+    def parse_html(content: str, url: str, backend: str = None):
+        """Extract title, text and links from an HTML page.
 
-        title = soup.title.string if soup.title else urlparse(url).netloc
-        text = soup.get_text(separator=" ", strip=True)
-        links = [urljoin(url, a.get("href", "")) for a in soup.find_all("a", href=True)]
+        `backend` is one of "bs4", "lxml", "selectolax" or "auto" (default:
+        Config.HTML_PARSER). All backends return the same shape and stop
+        collecting text and links once MAX_CONTENT_CHARS / MAX_LINKS are reached.
+        """
+        backend = _resolve_backend(backend or Config.HTML_PARSER)
+        if backend == "selectolax":
+            title, text, links = ContentParser._html_selectolax(content, url)
+        elif backend == "lxml" and content.strip():
+            try:
+                title, text, links = ContentParser._html_lxml(content, url)
+            except (ValueError, etree.ParserError) as e:
+                # e.g. a page that is only comments; bs4 copes with anything
+                print(f"lxml could not parse {url}, using bs4: {e}")
+                title, text, links = ContentParser._html_bs4(content, url)
+        else:
+            title, text, links = ContentParser._html_bs4(content, url)
 
         return {
-            "title": title,
-            "content": text[:5000],
-            "links": links[:50],
+            "title": title or urlparse(url).netloc,
+            "content": text,
+            "links": links,
             "content_type": "html",
         }
 
+    @staticmethod
+    def _html_bs4(content: str, url: str):
+        soup = BeautifulSoup(content, "html.parser")
+        for tag in soup(list(_SKIPPED_TAGS)):
+            tag.decompose()
+
+        title = soup.title.string if soup.title else None
+        text = _join_until(soup.stripped_strings)
+        hrefs = (a.get("href", "") for a in soup.find_all("a", href=True, limit=MAX_LINKS))
+        return title, text, _absolute_links(url, hrefs)
+
+    @staticmethod
+    def _html_lxml(content: str, url: str):
+        root = lxml_html.document_fromstring(_XML_DECLARATION.sub("", content, count=1))
+        etree.strip_elements(root, etree.Comment, *_SKIPPED_TAGS, with_tail=False)
+
+        title = root.findtext(".//title")
+        text = _join_until(root.itertext())
+        hrefs = (a.get("href") for a in root.iter("a") if a.get("href") is not None)
+        return title, text, _absolute_links(url, hrefs)
+
+    @staticmethod
+    def _html_selectolax(content: str, url: str):
+        tree = SelectolaxParser(content)
+        tree.strip_tags(list(_SKIPPED_TAGS))
+
+        title_node = tree.css_first("title")
+        title = title_node.text() if title_node else None
+        root = tree.root
+        text_nodes = (node.text(deep=False) for node in root.traverse(include_text=True) if node.tag == "-text") if root else ()
+        text = _join_until(text_nodes)
+        hrefs = (a.attributes.get("href") or "" for a in tree.css("a[href]"))
+        return title, text, _absolute_links(url, hrefs)
+
     @staticmethod
     def parse_xml(content: str, url: str):
         soup = BeautifulSoup(content, "xml")
         text = soup.get_text(separator=" ", strip=True)
         return {
             "title": urlparse(url).path.split("/")[-1] or urlparse(url).netloc,
-            "content": text[:5000],
+            "content": text[:MAX_CONTENT_CHARS],
             "links": [],
             "content_type": "xml",
         }
 
     @staticmethod
-    def parse_rss(url: str):
-        feed = feedparser.parse(url)
-        items = []
-        for entry in feed.entries[:20]:
-            items.append(
-                {
-                    "title": entry.get("title", "N/A"),
-                    "content": entry.get("summary", entry.get("description", ""))[:5000],
-                    "url": entry.get("link", url),
-                    "links": [entry.get("link", "")],
-                    "content_type": "rss",
-                    "published": entry.get("published", None),
-                }
-            )
-        return items
+    def parse_rss(content: bytes, url: str, headers: dict = None, limit: int = None):
+        """Yield feed items from an already downloaded feed body.
+
+        Items are produced lazily so callers can stop early (e.g. at max_hits);
+        `limit` caps how many entries are read, None reads the whole feed.
+        """
+        response_headers = {"content-location": url}
+        if headers and headers.get("Content-Type"):
+            response_headers["content-type"] = headers["Content-Type"]
+        feed = feedparser.parse(content, response_headers=response_headers)
+
+        entries = feed.entries if limit is None else itertools.islice(feed.entries, limit)
+        for entry in entries:
+            yield {
+                "title": entry.get("title", "N/A"),
+                "content": entry.get("summary", entry.get("description", ""))[:MAX_CONTENT_CHARS],
+                "url": entry.get("link", url),
+                "links": [entry.get("link", "")],
+                "content_type": "rss",
+                "published": entry.get("published", None),
+            }
 
     @staticmethod
-    def parse_pdf(content: bytes, url: str):
-        pdf = PdfReader(io.BytesIO(content))
-        text = ""
-        for page in pdf.pages[:10]:
-            extracted = page.extract_text() or ""
-            text += extracted + " "
+    def parse_pdf(content: bytes, url: str, max_pages: int = None, time_budget: float = None):
+        """Extract text page by page until MAX_CONTENT_CHARS is reached.
+
+        Pages are only decoded when reached, so a long document costs no more
+        than its first few pages. Extraction also stops once `time_budget`
+        seconds have passed, or when the caller's timer raises
+        PdfBudgetExceeded mid-page; the text collected so far is kept.
+        """
+        max_pages = max_pages or Config.PDF_MAX_PAGES
+        deadline = time.monotonic() + time_budget if time_budget else None
+        parts = []
+        size = 0
+        try:
+            pdf = PdfReader(io.BytesIO(content), strict=False)
+            for i in range(min(len(pdf.pages), max_pages)):
+                extracted = pdf.pages[i].extract_text() or ""
+                parts.append(extracted)
+                size += len(extracted) + 1
+                if size >= MAX_CONTENT_CHARS:
+                    break
+                if deadline and time.monotonic() > deadline:
+                    print(f"PDF time budget exceeded for {url} after {i + 1} pages")
+                    break
+        except PdfBudgetExceeded:
+            print(f"PDF time budget exceeded for {url} after {len(parts)} pages")
         return {
             "title": urlparse(url).path.split("/")[-1] or urlparse(url).netloc,
-            "content": text[:5000],
+            "content": " ".join(parts)[:MAX_CONTENT_CHARS],
             "links": [],
             "content_type": "pdf",
         }
@@ -68,7 +211,7 @@ class ContentParser:
     def parse_text(content: str, url: str):
         return {
             "title": urlparse(url).path.split("/")[-1] or urlparse(url).netloc,
-            "content": content[:5000],
+            "content": content[:MAX_CONTENT_CHARS],
             "links": [],
             "content_type": "txt",
         }
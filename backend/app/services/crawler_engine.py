@@ -1,191 +1,356 @@
-import time
 import requests
-from collections import deque
+from bson import ObjectId
+from pymongo import ReturnDocument
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from urllib.parse import urlparse
 
 from app.core.config import Config
-from app.services.content_parser import ContentParser
-from app.services.keyword_filter import matches_filter
+from app.services.buffered_writer import BufferedWriter
+from app.services.events import events
+from app.services.fingerprints import SeenUrls
+from app.services.frontier import Frontier
+from app.services.http_cache import ValidatorCache
+from app.services.http_client import create_session
+from app.services.parse_pool import submit_parse
+from app.services.politeness import Politeness, host_of
+from app.services.retry import RETRYABLE_STATUSES, CircuitBreaker, backoff_delay, retry_after, sleep_unless_stopped
+
+# Content types and leading bytes of bodies no parser can use
+_BINARY_TYPES = ("image/", "audio/", "video/", "font/", "application/zip", "application/octet-stream",
+                 "application/gzip", "application/x-")
+_BINARY_MAGIC = (b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b", b"Rar!", b"\x7fELF")
+
+
+class FetchedResponse:
+    """The parts of a response the pipeline uses, with the body already read"""
+
+    def __init__(self, status_code: int, headers, content: bytes, encoding: str, ctype: str, truncated: bool = False):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.ctype = ctype
+        self.truncated = truncated
+
 
 class CrawlerEngine:
-    def __init__(self, db):
+    def __init__(self, db, politeness: Politeness = None):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": Config.USER_AGENT})
+        self.session = create_session()
+        self.politeness = politeness or Politeness(self.session)
+        self.breaker = CircuitBreaker()
 
-    def _fetch(self, url: str):
+    def _fetch(self, url: str, headers: dict = None, request_delay: float = 0,
+               respect_robots: bool = True, stop_check=None):
+        if not self.politeness.allowed(url, respect_robots):
+            print(f"Skipping {url}: disallowed by robots.txt")
+            return None
+
+        host = host_of(url)
         for attempt in range(Config.MAX_RETRIES):
+            if stop_check and stop_check():
+                return None
+            if not self.breaker.allow(host):
+                print(f"Skipping {url}: circuit open for {host}")
+                return None
+            # Every attempt, retries included, waits for its turn on the host
+            if not self.politeness.wait(url, request_delay, respect_robots, stop_check):
+                return None
+
+            r = delay = None
             try:
-                r = self.session.get(url, timeout=Config.TIMEOUT)
-                r.raise_for_status()
-                return r
+                r = self.session.get(url, timeout=Config.TIMEOUT, headers=headers, stream=True)
+                try:
+                    if r.status_code in RETRYABLE_STATUSES:
+                        error = f"HTTP {r.status_code}"
+                        delay = retry_after(r.headers)
+                    else:
+                        r.raise_for_status()
+                        fetched = self._read_body(r, url)
+                        self.breaker.record_success(host)
+                        return fetched
+                finally:
+                    r.close()
+            except requests.HTTPError as e:
+                # 403, 404, 410...: the host answered and asking again won't help
+                self.breaker.record_success(host)
+                print(f"Not retrying {url}: {e}")
+                return None
             except requests.RequestException as e:
-                if attempt < Config.MAX_RETRIES - 1:
-                    time.sleep(Config.RETRY_DELAY)
-                else:
-                    # Log failure on final attempt
-                    print(f"Failed to fetch {url} after {Config.MAX_RETRIES} attempts: {e}")
+                # Connection errors and timeouts say the host itself is in trouble
+                error = e
+                self.breaker.record_failure(host)
+
+            # Rate limiting is not the host failing, but all runs back off from it
+            if delay is not None:
+                self.politeness.throttle.defer(host, delay)
+
+            if attempt == Config.MAX_RETRIES - 1:
+                # One broken page is not a broken host: count 5xx once per URL
+                if r is not None and r.status_code != 429:
+                    self.breaker.record_failure(host)
+                # Log failure on final attempt
+                print(f"Failed to fetch {url} after {Config.MAX_RETRIES} attempts: {error}")
+                break
+            # With Retry-After, politeness.wait above holds the next attempt back
+            if delay is None and not sleep_unless_stopped(backoff_delay(attempt), stop_check):
+                break
         return None
 
-    def _detect_type(self, response, url: str):
-        ct = (response.headers.get("Content-Type", "") or "").lower()
-        if "application/pdf" in ct or url.lower().endswith(".pdf"):
+    def _read_body(self, r, url: str):
+        """Stream the body, deciding from headers and the first chunk whether it is worth reading.
+
+        Bodies are capped per type (Config.MAX_BODY_BYTES): text formats are
+        truncated at the cap since the parsers keep only the beginning anyway,
+        while a PDF over the cap is abandoned because a truncated PDF can't be
+        parsed. Returns None when the download is skipped.
+        """
+        if r.status_code == 304:
+            return FetchedResponse(304, r.headers, b"", r.encoding, None)
+
+        chunks = r.iter_content(chunk_size=Config.FETCH_CHUNK_SIZE)
+        head = next(chunks, b"")
+        ctype = self._detect_type(r.headers, url, head)
+        if ctype is None:
+            print(f"Skipping {url}: unsupported content ({r.headers.get('Content-Type')})")
+            return None
+
+        cap = Config.MAX_BODY_BYTES[ctype]
+        try:
+            declared = int(r.headers.get("Content-Length") or 0)
+        except ValueError:
+            declared = 0
+        if ctype == "pdf" and declared > cap:
+            print(f"Skipping {url}: PDF of {declared} bytes exceeds {cap}")
+            return None
+
+        body = bytearray(head)
+        truncated = False
+        for chunk in chunks:
+            body += chunk
+            if len(body) >= cap:
+                if ctype == "pdf":
+                    print(f"Skipping {url}: PDF exceeds {cap} bytes")
+                    return None
+                truncated = len(body) > cap
+                break
+
+        # requests falls back to ISO-8859-1 for text/* without a charset; only
+        # trust an explicit one and let the parser default to UTF-8 otherwise
+        encoding = r.encoding if "charset" in (r.headers.get("Content-Type") or "").lower() else None
+        return FetchedResponse(r.status_code, r.headers, bytes(body[:cap]), encoding, ctype, truncated)
+
+    def _detect_type(self, headers, url: str, head: bytes = b""):
+        ct = (headers.get("Content-Type", "") or "").lower()
+        sniff = head[:1024].lstrip().lower()
+        if "application/pdf" in ct or url.lower().endswith(".pdf") or head.startswith(b"%PDF"):
             return "pdf"
+        if "rss" in ct or "atom" in ct or b"<rss" in sniff or b"<feed" in sniff or b"<rdf:rdf" in sniff:
+            return "rss"
         if "application/xml" in ct or "text/xml" in ct:
             return "xml"
         if "text/plain" in ct or url.lower().endswith(".txt"):
             return "txt"
-        if "rss" in ct or "feed" in url.lower():
+        if sniff.startswith((b"<!doctype html", b"<html")):
+            return "html"
+        if "feed" in url.lower():
             return "rss"
+        if ct.startswith(_BINARY_TYPES) or head.startswith(_BINARY_MAGIC):
+            return None
         return "html"
 
+    def _report_progress(self, source_oid, run_id: str, writer: BufferedWriter):
+        """Expose the stored item counts on the run while it is in progress"""
+        progress = {
+            "crawled_count": writer.written,
+            "new_count": writer.counts["new"],
+            "updated_count": writer.counts["updated"],
+            "unchanged_count": writer.counts["unchanged"],
+        }
+        self.db.crawl_runs.update_one({"_id": ObjectId(run_id)}, {"$set": progress})
+        # Mirror them on the source, with its running item total, so listing
+        # sources needs no per-source counts or run lookups
+        source = self.db.sources.find_one_and_update(
+            {"_id": source_oid},
+            {
+                "$set": {f"last_run.{k}": v for k, v in progress.items()},
+                "$inc": {"total_pages": writer.last_batch["new"]},
+            },
+            projection={"total_pages": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        events.publish(
+            "progress",
+            str(source_oid),
+            run_id=run_id,
+            total_pages=source.get("total_pages", 0) if source else None,
+            **progress,
+        )
+
+    def _option(self, source_doc: dict, key: str, default):
+        """Read a crawl option stored either at top level or under `options`"""
+        value = source_doc.get(key)
+        if value is None:
+            value = (source_doc.get("options") or {}).get(key)
+        return default if value is None else value
+
+    def _number(self, source_doc: dict, key: str, default, cast):
+        """A numeric option converted with `cast`, or `default` if it isn't a number"""
+        value = self._option(source_doc, key, None)
+        if value is None:
+            return default
+        try:
+            return cast(value)
+        except (TypeError, ValueError, OverflowError):
+            # Saved before the API validated it
+            print(f"Ignoring invalid {key} {value!r} for {source_doc.get('_id')}")
+            return default
+
     def crawl(self, source_doc: dict, run_id: str, stop_check):
         source_url = source_doc["url"]
         source_id = str(source_doc["_id"])
         max_hits = int(source_doc.get("max_hits", Config.DEFAULT_MAX_HITS))
         keyword_filter = source_doc.get("keyword_filter", "no_filter")
+        # None falls back to Config.MIN_RELEVANCE
+        min_relevance = self._number(source_doc, "min_relevance", None, float)
+        concurrency = self._number(source_doc, "concurrency", Config.DEFAULT_CONCURRENCY, int)
+        concurrency = max(1, min(concurrency, Config.MAX_CONCURRENCY))
+        # Fetched bodies waiting for or being parsed; fetching pauses beyond this
+        max_backlog = concurrency * Config.PARSE_BACKLOG_FACTOR
+        # Set when the run ends (max_hits, stop or error) so fetches still
+        # queued or retrying give up instead of holding host slots
+        finished = threading.Event()
+        fetch_options = {
+            "request_delay": max(0.0, self._number(source_doc, "request_delay", 0.0, float)),
+            "respect_robots": bool(self._option(source_doc, "respect_robots", True)),
+            "stop_check": lambda: finished.is_set() or stop_check(),
+        }
 
         crawled_count = 0
-        visited = set()
-        q = deque([source_url])
+        seen = SeenUrls(self.db, source_id, enabled=bool(self._option(source_doc, "skip_seen", Config.SKIP_SEEN_URLS)))
+        frontier = Frontier(
+            source_url,
+            max_depth=max(0, self._number(source_doc, "max_depth", Config.DEFAULT_MAX_DEPTH, int)),
+            scope=self._option(source_doc, "scope", "domain"),
+            include_subdomains=bool(self._option(source_doc, "include_subdomains", True)),
+            skip=seen if seen.enabled else None,
+        )
+        # Pipeline: fetches run on a thread pool, parsing and filtering on the
+        # shared process pool, and storing stays on this thread so the
+        # frontier and `crawled_count` are never shared.
+        in_flight = {}  # future -> ("fetch" | "parse", url, depth)
+        fetching = parsing = 0
+        pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"fetch-{source_id}")
+        validators = ValidatorCache(self.db, source_id)
+        writer = BufferedWriter(
+            self.db.crawled_data,
+            on_flush=lambda w: self._report_progress(source_doc["_id"], run_id, w),
+        )
 
-        while q and crawled_count < max_hits:
-            if stop_check():
-                break
+        try:
+            while (frontier or in_flight) and crawled_count < max_hits:
+                if stop_check():
+                    break
 
-            url = q.popleft()
-            if url in visited:
-                continue
+                # Keep up to `concurrency` requests in flight while parsers keep up
+                while frontier and fetching < concurrency and fetching + parsing < max_backlog:
+                    url, depth = frontier.pop()
+                    headers = validators.headers_for(url, follow_links=depth < frontier.max_depth)
+                    in_flight[pool.submit(self._fetch, url, headers, **fetch_options)] = ("fetch", url, depth)
+                    fetching += 1
 
-            r = self._fetch(url)
-            if r is None:
-                visited.add(url)
-                continue
+                if not in_flight:
+                    continue
 
-            visited.add(url)
-            ctype = self._detect_type(r, url)
+                done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+                writer.flush_if_due()
+                for future in done:
+                    stage, url, depth = in_flight.pop(future)
+                    if stage == "fetch":
+                        fetching -= 1
+                    else:
+                        parsing -= 1
+                    if crawled_count >= max_hits or stop_check():
+                        break
 
-            if stop_check():
-                break
+                    if stage == "fetch":
+                        try:
+                            r = future.result()
+                        except Exception as e:
+                            # Log error but continue crawling
+                            print(f"Error fetching {url}: {e}")
+                            continue
+                        if r is None:
+                            continue
+                        if depth >= frontier.max_depth:
+                            seen.add(url)
 
-            try:
-                if ctype == "rss":
-                    items = ContentParser.parse_rss(url)
-                    for item in items:
+                        if r.status_code == 304:
+                            # Unchanged since the last run: nothing to download or parse
+                            validators.record(url, r)
+                            continue
+
+                        ctype = r.ctype
+                        validators.record(url, r, ctype)
+
+                        # Hand the raw bytes over; feeds are parsed from this body too
+                        # instead of letting feedparser download them again
+                        args = (ctype, r.content, r.encoding, url, dict(r.headers), keyword_filter, min_relevance)
+                        in_flight[submit_parse(*args)] = ("parse", url, depth)
+                        parsing += 1
+                        continue
+
+                    try:
+                        docs, links = future.result()
+                        frontier.add_links(links, depth)
+                    except Exception as e:
+                        # Log error but continue crawling
+                        print(f"Error processing {url}: {e}")
+                        continue
+
+                    stored = 0
+                    for doc in docs:
                         if stop_check():
                             break
-                        
-                        # Apply keyword filter
-                        content_text = f"{item.get('title', '')} {item.get('content', '')} {item.get('description', '')}"
-                        if not matches_filter(content_text, keyword_filter):
-                            continue  # Skip this item if it doesn't match filter
-                        
-                        item["source_id"] = source_id
-                        item["source_url"] = source_url
-                        item["run_id"] = run_id
-                        item["crawled_at"] = datetime.now()
-                        self.db.crawled_data.insert_one(item)
+
+                        doc.setdefault("url", url)
+                        doc.update(
+                            {
+                                "source_id": source_id,
+                                "source_url": source_url,
+                                "run_id": run_id,
+                                "keyword_filter": keyword_filter,
+                                "depth": depth,
+                                "crawled_at": datetime.now(),
+                            }
+                        )
+                        if not writer.add(doc):
+                            continue
+                        stored += 1
                         crawled_count += 1
                         if crawled_count >= max_hits:
                             break
-
-                elif ctype == "pdf":
-                    parsed = ContentParser.parse_pdf(r.content, url)
-                    
-                    # Apply keyword filter
-                    content_text = f"{parsed.get('title', '')} {parsed.get('content', '')} {parsed.get('text', '')}"
-                    if not matches_filter(content_text, keyword_filter):
-                        visited.add(url)
-                        continue  # Skip if doesn't match filter
-                    
-                    parsed.update(
-                        {
-                            "url": url,
-                            "source_id": source_id,
-                            "source_url": source_url,
-                            "run_id": run_id,
-                            "crawled_at": datetime.now(),
-                        }
-                    )
-                    self.db.crawled_data.insert_one(parsed)
-                    crawled_count += 1
-
-                elif ctype == "xml":
-                    parsed = ContentParser.parse_xml(r.text, url)
-                    
-                    # Apply keyword filter
-                    content_text = f"{parsed.get('title', '')} {parsed.get('content', '')} {parsed.get('text', '')}"
-                    if not matches_filter(content_text, keyword_filter):
-                        visited.add(url)
-                        continue  # Skip if doesn't match filter
-                    
-                    parsed.update(
-                        {
-                            "url": url,
-                            "source_id": source_id,
-                            "source_url": source_url,
-                            "run_id": run_id,
-                            "crawled_at": datetime.now(),
-                        }
-                    )
-                    self.db.crawled_data.insert_one(parsed)
-                    crawled_count += 1
-
-                elif ctype == "txt":
-                    parsed = ContentParser.parse_text(r.text, url)
-                    
-                    # Apply keyword filter
-                    content_text = f"{parsed.get('title', '')} {parsed.get('content', '')} {parsed.get('text', '')}"
-                    if not matches_filter(content_text, keyword_filter):
-                        visited.add(url)
-                        continue  # Skip if doesn't match filter
-                    
-                    parsed.update(
-                        {
-                            "url": url,
-                            "source_id": source_id,
-                            "source_url": source_url,
-                            "run_id": run_id,
-                            "crawled_at": datetime.now(),
-                        }
-                    )
-                    self.db.crawled_data.insert_one(parsed)
-                    crawled_count += 1
-
-                else:
-                    parsed = ContentParser.parse_html(r.text, url)
-                    
-                    # Apply keyword filter
-                    content_text = f"{parsed.get('title', '')} {parsed.get('content', '')} {parsed.get('text', '')}"
-                    if not matches_filter(content_text, keyword_filter):
-                        visited.add(url)
-                        continue  # Skip if doesn't match filter
-                    
-                    parsed.update(
-                        {
-                            "url": url,
-                            "source_id": source_id,
-                            "source_url": source_url,
-                            "run_id": run_id,
-                            "crawled_at": datetime.now(),
-                        }
-                    )
-                    self.db.crawled_data.insert_one(parsed)
-                    crawled_count += 1
-
-                    if url == source_url and crawled_count < max_hits:
-                        for link in parsed.get("links", [])[:20]:
-                            if link.startswith("http") and link not in visited:
-                                q.append(link)
-
-            except Exception as e:
-                # Log error but continue crawling
-                print(f"Error processing {url}: {e}")
-                visited.add(url)  # Mark as visited to avoid retrying
-                continue
+                    if docs and stored == len(docs):
+                        # Only now may a later run skip this page on a 304
+                        validators.accept(url)
+        finally:
+            # Don't wait for fetches or parses that are no longer needed
+            finished.set()
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+            # Persist whatever is still buffered, also when stopped; if that
+            # fails the validators are not saved either
+            writer.close()
+            validators.save()
+            seen.save(run_id)
 
         return {
-            "crawled_count": crawled_count,
+            "crawled_count": writer.written,
+            "cache_hits": validators.hits,
+            "cache_misses": validators.misses,
+            "seen_skipped": frontier.skipped,
             "stopped": stop_check(),
         }
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+# Fields returned by list views; `content` and `links` only when asked for
+DEFAULT_FIELDS = (
+    "title", "url", "source_id", "source_url", "run_id", "content_type", "keyword_filter",
+    "crawled_at", "published", "relevance", "depth",
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def build_filter(source_id=None, run_id=None, content_type=None, keyword_filter=None,
+                 since: datetime = None, until: datetime = None, q: str = None):
+    """Mongo filter for crawled_data from the query parameters that were given"""
+    query = {}
+    if source_id:
+        query["source_id"] = source_id
+    if run_id:
+        query["run_id"] = run_id
+    if content_type:
+        query["content_type"] = content_type
+    if keyword_filter:
+        query["keyword_filter"] = keyword_filter
+    if since or until:
+        query["crawled_at"] = {}
+        if since:
+            query["crawled_at"]["$gte"] = since
+        if until:
+            query["crawled_at"]["$lt"] = until
+    if q:
+        query["$text"] = {"$search": q}
+    return query
+
+
+def projection(fields: str = None, with_score: bool = False):
+    """Projection for a comma separated field list, DEFAULT_FIELDS when empty"""
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else DEFAULT_FIELDS
+    proj = {name: 1 for name in names if name not in ("id", "_id")}
+    if with_score:
+        proj["score"] = {"$meta": "textScore"}
+    return proj
+
+
+def encode_cursor(value: dict):
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def after_cursor(query: dict, cursor: str):
+    """Add the keyset condition for the page after `cursor` (newest first)"""
+    value = decode_cursor(cursor)
+    try:
+        crawled_at = datetime.fromisoformat(value["t"])
+        last_id = ObjectId(value["id"])
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    keyset = {"$or": [
+        {"crawled_at": {"$lt": crawled_at}},
+        {"crawled_at": crawled_at, "_id": {"$lt": last_id}},
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+def cursor_after(doc: dict):
+    """Cursor for the page that follows `doc` (newest first)"""
+    return encode_cursor({"t": doc["crawled_at"].isoformat(), "id": str(doc["_id"])})
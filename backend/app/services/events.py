@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+
+from app.core.config import Config
+
+
+class EventBus:
+    """Run events fanned out from crawl threads to Server-Sent Event streams.
+
+    Crawl threads call `publish`; each subscriber is an asyncio queue read by
+    one `GET /api/events` stream. Progress events are coalesced per source
+    and sent at most every Config.EVENT_PROGRESS_INTERVAL seconds, so the
+    number of messages doesn't grow with the write rate. Any other event
+    first flushes the source's pending progress to keep the order intact.
+    The last events are kept so a reconnecting client can catch up.
+    """
+
+    def __init__(self, history: int = 500):
+        self.published = 0
+        self.coalesced = 0
+        self.dropped_subscribers = 0
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._history = deque(maxlen=history)
+        self._progress = {}  # source_id -> latest progress payload not sent yet
+        self._subscribers = set()
+        self._loop = None
+        self._flusher = None
+
+    def publish(self, event_type: str, source_id: str, **data):
+        if event_type == "progress":
+            with self._lock:
+                if source_id in self._progress:
+                    self.coalesced += 1
+                self._progress[source_id] = data
+            return
+        with self._lock:
+            pending = self._progress.pop(source_id, None)
+        if pending is not None:
+            self._emit("progress", source_id, pending)
+        self._emit(event_type, source_id, data)
+
+    def _emit(self, event_type: str, source_id: str, data: dict):
+        with self._lock:
+            event = {"id": next(self._seq), "type": event_type, "source_id": source_id, "ts": time.time(), **data}
+            self._history.append(event)
+            self.published += 1
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: dict):
+        # Runs on the event loop
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client this far behind reconnects and resyncs instead
+                self._subscribers.discard(queue)
+                self.dropped_subscribers += 1
+
+    def flush_progress(self):
+        with self._lock:
+            pending, self._progress = self._progress, {}
+        for source_id, data in pending.items():
+            self._emit("progress", source_id, data)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(Config.EVENT_PROGRESS_INTERVAL)
+            self.flush_progress()
+
+    def subscribe(self, last_event_id=None):
+        """New subscriber queue; call from the event loop"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=Config.EVENT_QUEUE_SIZE)
+        with self._lock:
+            self._loop = loop
+            if last_event_id is not None:
+                for event in self._history:
+                    if event["id"] > last_event_id and not queue.full():
+                        queue.put_nowait(event)
+        self._subscribers.add(queue)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_periodically())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def is_subscribed(self, queue):
+        return queue in self._subscribers
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+# Shared by the runner, the engine and the API
+events = EventBus()
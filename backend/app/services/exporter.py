@@ -0,0 +1,209 @@
+import asyncio
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.core.config import Config
+from app.services.data_query import DEFAULT_FIELDS
+
+# Optional: Parquet export is only offered when pyarrow is installed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Columns of CSV and Parquet exports when no `fields` are given
+TABLE_FIELDS = DEFAULT_FIELDS + ("description", "content")
+
+
+def available_formats():
+    return [f for f in FORMATS if f != "parquet" or pq is not None]
+
+
+def _plain(value):
+    """JSON-safe form of a stored value"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _cell(value):
+    """Flat text for a CSV/Parquet cell; nested values are written as JSON"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(_plain(value), ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _NdjsonEncoder:
+    def __init__(self, fields):
+        self.fields = fields
+
+    def start(self):
+        return b""
+
+    def encode(self, docs):
+        lines = []
+        for doc in docs:
+            doc["id"] = str(doc.pop("_id"))
+            lines.append(json.dumps(_plain(doc), ensure_ascii=False) + "\n")
+        return "".join(lines).encode("utf-8")
+
+    def finish(self):
+        return b""
+
+
+class _CsvEncoder:
+    def __init__(self, fields):
+        self.fields = fields
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out)
+
+    def _take(self):
+        data = self._out.getvalue().encode("utf-8")
+        self._out.seek(0)
+        self._out.truncate()
+        return data
+
+    def start(self):
+        self._writer.writerow(("id",) + self.fields)
+        return self._take()
+
+    def encode(self, docs):
+        for doc in docs:
+            self._writer.writerow([str(doc["_id"])] + [_cell(doc.get(f)) for f in self.fields])
+        return self._take()
+
+    def finish(self):
+        return b""
+
+
+class _Drain:
+    """Write-only file object whose contents are taken out between row groups"""
+
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+class _ParquetEncoder:
+    """One row group per batch keeps memory flat"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.schema = pa.schema([
+            (name, pa.timestamp("ms") if name == "crawled_at" else pa.string()) for name in ("id",) + fields
+        ])
+        self._sink = _Drain()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="snappy")
+
+    def start(self):
+        return self._sink.take()
+
+    def encode(self, docs):
+        columns = {"id": [str(doc["_id"]) for doc in docs]}
+        for name in self.fields:
+            if name == "crawled_at":
+                columns[name] = [d.get(name) if isinstance(d.get(name), datetime) else None for d in docs]
+            else:
+                columns[name] = [_cell(d.get(name)) for d in docs]
+        self._writer.write_table(pa.table(columns, schema=self.schema))
+        return self._sink.take()
+
+    def finish(self):
+        self._writer.close()
+        return self._sink.take()
+
+
+_ENCODERS = {"ndjson": _NdjsonEncoder, "csv": _CsvEncoder, "parquet": _ParquetEncoder}
+
+
+async def export_stream(collection, query: dict, fmt: str, fields=None, compress: bool = False):
+    """Async iterator of encoded export chunks for every crawled_data document matching query.
+
+    `collection` is on the async client. Documents are read in batches of
+    Config.EXPORT_BATCH_SIZE and each batch is encoded (and compressed) on a
+    worker thread as it arrives, so memory use does not depend on how many
+    documents are exported and the event loop is never busy for long.
+    """
+    projection = {name: 1 for name in fields} if fields else None
+    if projection is None and fmt != "ndjson":
+        fields = TABLE_FIELDS
+        projection = {name: 1 for name in fields}
+    fields = tuple(fields or ())
+
+    encoder = _ENCODERS[fmt](fields)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # 31: gzip container
+
+    def output(data, last=False):
+        if compressor:
+            data = compressor.compress(data) + (compressor.flush() if last else b"")
+        return data
+
+    def encode(docs):
+        return output(encoder.encode(docs))
+
+    cursor = (
+        collection.find(query, projection, no_cursor_timeout=True)
+        .sort([("crawled_at", 1), ("_id", 1)])
+        .batch_size(Config.EXPORT_BATCH_SIZE)
+    )
+    try:
+        data = output(encoder.start())
+        if data:
+            yield data
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= Config.EXPORT_BATCH_SIZE:
+                data = await asyncio.to_thread(encode, batch)
+                batch = []
+                if data:
+                    yield data
+        if batch:
+            data = await asyncio.to_thread(encode, batch)
+            if data:
+                yield data
+        yield output(encoder.finish(), last=True)
+    finally:
+        await cursor.close()
@@ -0,0 +1,135 @@
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+from bson import Binary
+
+from app.core.config import Config
+from app.services.url_utils import url_key
+
+
+class FingerprintSet:
+    """Set of 64-bit URL fingerprints (see url_utils.url_key) in a flat array.
+
+    Open addressing with linear probing over an array('Q'), kept at most half
+    full: about 16 bytes per URL, against roughly 100 for a set of URL
+    strings. 0 marks an empty slot, so a fingerprint of 0 is stored as 1.
+    """
+
+    def __init__(self, values=()):
+        self._slots = array("Q", bytes(8 * 1024))
+        self._mask = len(self._slots) - 1
+        self._len = 0
+        for value in values:
+            self.add(value)
+
+    def __len__(self):
+        return self._len
+
+    def _index(self, value):
+        # Fingerprints are already uniformly distributed; the low bits will do
+        slots, mask = self._slots, self._mask
+        i = value & mask
+        while True:
+            current = slots[i]
+            if current == 0 or current == value:
+                return i
+            i = (i + 1) & mask
+
+    def __contains__(self, value):
+        value = value or 1
+        return self._slots[self._index(value)] == value
+
+    def add(self, value):
+        """Add a fingerprint; returns False when it was already present"""
+        value = value or 1
+        i = self._index(value)
+        if self._slots[i] == value:
+            return False
+        self._slots[i] = value
+        self._len += 1
+        if self._len * 2 > len(self._slots):
+            self._grow()
+        return True
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for value in old:
+            if value:
+                self._slots[self._index(value)] = value
+
+    def __iter__(self):
+        return (value for value in self._slots if value)
+
+    def to_bytes(self):
+        """Packed little-endian fingerprints, 8 bytes each"""
+        packed = array("Q", iter(self))
+        if sys.byteorder != "little":
+            packed.byteswap()
+        return packed.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        packed = array("Q")
+        packed.frombytes(data)
+        if sys.byteorder != "little":
+            packed.byteswap()
+        return cls(packed)
+
+
+class SeenUrls:
+    """URLs a source fetched in recent runs, persisted in `seen_urls`.
+
+    Each run stores the fingerprints of the pages it fetched as one packed
+    document that expires after Config.SEEN_URLS_TTL seconds. The next runs
+    load the source's unexpired documents, newest first, so a page fetched
+    within the TTL can be skipped. Loading stops at Config.MAX_FRONTIER_SIZE
+    fingerprints, as many URLs as a run can queue.
+    """
+
+    def __init__(self, db, source_id: str, enabled: bool = True):
+        self.collection = db.seen_urls
+        self.source_id = source_id
+        self.enabled = enabled
+        self.previous = FingerprintSet()
+        self.fetched = FingerprintSet()
+
+        if self.enabled:
+            cursor = self.collection.find(
+                {"source_id": source_id, "expires_at": {"$gt": datetime.now()}},
+                {"fingerprints": 1},
+                sort=[("expires_at", -1)],
+            )
+            for entry in cursor:
+                self.previous.update(FingerprintSet.from_bytes(entry["fingerprints"]))
+                if len(self.previous) >= Config.MAX_FRONTIER_SIZE:
+                    break
+
+    def __contains__(self, url: str):
+        return url_key(url) in self.previous
+
+    def add(self, url: str):
+        if self.enabled:
+            self.fetched.add(url_key(url))
+
+    def save(self, run_id: str):
+        if not self.enabled or not self.fetched:
+            return
+        now = datetime.now()
+        try:
+            self.collection.insert_one({
+                "source_id": self.source_id,
+                "run_id": run_id,
+                "count": len(self.fetched),
+                "fingerprints": Binary(self.fetched.to_bytes()),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=Config.SEEN_URLS_TTL),
+            })
+        except Exception as e:
+            print(f"Error saving seen URLs for {self.source_id}: {e}")
@@ -0,0 +1,72 @@
+from collections import deque
+
+from app.core.config import Config
+from app.services.fingerprints import FingerprintSet
+from app.services.url_utils import in_scope, url_key
+
+
+class Frontier:
+    """Breadth-first queue of URLs still to fetch, with the depth of each.
+
+    A URL is marked as seen when it is queued, so each page is fetched at
+    most once per run. Seen URLs are kept as 64-bit fingerprints of their
+    normalized form in a FingerprintSet. Links are only queued when they
+    are in scope and the page they were found on is above max_depth.
+
+    Leaf pages (at max_depth, so no links are followed from them) listed in
+    `skip`, typically the SeenUrls of recent runs, are not queued again.
+    """
+
+    def __init__(self, seed_url: str, max_depth: int = None, scope: str = "domain",
+                 include_subdomains: bool = True, max_size: int = None, skip=None):
+        self.seed_url = seed_url
+        self.max_depth = Config.DEFAULT_MAX_DEPTH if max_depth is None else max_depth
+        self.scope = scope or "domain"
+        self.include_subdomains = include_subdomains
+        self.max_size = max_size or Config.MAX_FRONTIER_SIZE
+        self.skip = skip
+        self.dropped = 0
+        self.skipped = 0
+        self.invalid = 0
+        self._queue = deque()
+        self._seen = FingerprintSet()
+        self.add(seed_url, 0)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __bool__(self):
+        return bool(self._queue)
+
+    def add(self, url: str, depth: int):
+        """Queue a URL unless it was seen already; returns whether it was queued"""
+        key = url_key(url)
+        if key in self._seen:
+            return False
+        if len(self._queue) >= self.max_size:
+            self.dropped += 1
+            return False
+        self._seen.add(key)
+        if self.skip is not None and 0 < depth and depth >= self.max_depth and url in self.skip:
+            self.skipped += 1
+            return False
+        self._queue.append((url, depth))
+        return True
+
+    def add_links(self, links, depth: int):
+        """Queue in-scope links found on a page fetched at `depth`"""
+        if depth >= self.max_depth:
+            return 0
+        added = 0
+        for link in links:
+            try:
+                if in_scope(link, self.seed_url, self.scope, self.include_subdomains) and self.add(link, depth + 1):
+                    added += 1
+            except ValueError:
+                # Unparsable href, e.g. a port out of range or a broken IPv6 host
+                self.invalid += 1
+        return added
+
+    def pop(self):
+        """Next (url, depth) in breadth-first order"""
+        return self._queue.popleft()
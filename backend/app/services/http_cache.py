@@ -0,0 +1,96 @@
+from datetime import datetime
+from pymongo import UpdateOne
+
+from app.core.config import Config
+from app.services.url_utils import url_fingerprint
+
+# Types whose pages we don't follow links from; a 304 loses nothing for them
+_LEAF_TYPES = {"rss", "xml", "pdf", "txt"}
+
+
+class ValidatorCache:
+    """Per-run view of the persistent ETag / Last-Modified cache.
+
+    Validators for a source are loaded once when the run starts and new ones
+    are written back in one bulk upsert when it ends, so the cache adds no
+    per-request round-trips to Mongo. A response's validators are only kept
+    once the engine `accept`s the page (its items were handed to the writer);
+    otherwise a page that was never stored would get a 304 on every later run.
+    """
+
+    def __init__(self, db, source_id: str):
+        self.collection = db.http_cache
+        self.source_id = source_id
+        self.enabled = Config.HTTP_CACHE_ENABLED
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._pending = {}
+        self._dirty = {}
+
+        if self.enabled:
+            for entry in self.collection.find({"source_id": source_id}):
+                self._entries[entry["url_hash"]] = entry
+
+    def headers_for(self, url: str, follow_links: bool = False):
+        """Conditional request headers for a URL, or None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(url_fingerprint(url))
+        if not entry:
+            return None
+        # An unchanged HTML page still has to be parsed if its links are followed
+        if follow_links and entry.get("content_type") not in _LEAF_TYPES:
+            return None
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers or None
+
+    def record(self, url: str, response, content_type: str = None):
+        """Count a hit or miss and hold the validators of a fresh response until `accept`"""
+        if not self.enabled:
+            return
+        if response.status_code == 304:
+            self.hits += 1
+            return
+
+        self.misses += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        url_hash = url_fingerprint(url)
+        self._pending[url_hash] = {
+            "url_hash": url_hash,
+            "url": url,
+            "source_id": self.source_id,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "updated_at": datetime.now(),
+        }
+
+    def accept(self, url: str):
+        """The page at url was stored; its validators are saved with the run"""
+        entry = self._pending.pop(url_fingerprint(url), None)
+        if entry:
+            self._dirty[entry["url_hash"]] = entry
+
+    def save(self):
+        if not self._dirty:
+            return
+        ops = [
+            UpdateOne({"source_id": self.source_id, "url_hash": url_hash}, {"$set": entry}, upsert=True)
+            for url_hash, entry in self._dirty.items()
+        ]
+        try:
+            self.collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            print(f"Error saving HTTP validator cache for {self.source_id}: {e}")
+        self._entries.update(self._dirty)
+        self._dirty = {}
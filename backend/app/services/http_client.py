@@ -0,0 +1,178 @@
+import ipaddress
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app.core.config import Config
+
+
+class DnsCache:
+    """Resolved addresses per (host, port), kept for Config.DNS_CACHE_TTL seconds"""
+
+    def __init__(self, ttl: float = None):
+        self.ttl = Config.DNS_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int):
+        """Every address of the host, in getaddrinfo order"""
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (addresses, time.monotonic() + self.ttl)
+        return addresses
+
+    def demote(self, host: str, port: int, address: str):
+        """Move an address that failed to the back, so later connections try the others first"""
+        key = (host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and address in entry[0]:
+                self._entries[key] = ([a for a in entry[0] if a != address] + [address], entry[1])
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+
+dns_cache = DnsCache()
+
+
+def _is_ip(host: str):
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _CachedDnsConnection:
+    """Connects to a cached address; TLS (SNI, certificate) still checks the host name.
+
+    The host's addresses are tried in turn, as urllib3 does when it resolves
+    the name itself.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        if not Config.DNS_CACHE_TTL or _is_ip(host):
+            return super()._new_conn()
+        try:
+            addresses = dns_cache.resolve(host, self.port)
+        except OSError:
+            # Let urllib3 resolve it again and raise its usual error
+            return super()._new_conn()
+        try:
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except Exception:
+                    dns_cache.demote(host, self.port, address)
+            self._dns_host = addresses[-1]
+            return super()._new_conn()
+        except Exception:
+            # Every address failed; they may have moved, resolve afresh next time
+            dns_cache.forget(host, self.port)
+            raise
+        finally:
+            self._dns_host = host
+
+
+class _CachedDnsHTTPConnection(_CachedDnsConnection, HTTPConnection):
+    pass
+
+
+class _CachedDnsHTTPSConnection(_CachedDnsConnection, HTTPSConnection):
+    pass
+
+
+class _CountingPool:
+    """Counts requests that find every pooled connection of the host in use"""
+
+    waits = 0
+
+    def _get_conn(self, timeout=None):
+        if self.pool is not None and self.pool.empty():
+            self.waits += 1
+        return super()._get_conn(timeout)
+
+
+class _HTTPPool(_CountingPool, HTTPConnectionPool):
+    ConnectionCls = _CachedDnsHTTPConnection
+
+
+class _HTTPSPool(_CountingPool, HTTPSConnectionPool):
+    ConnectionCls = _CachedDnsHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with per-host pools that block instead of overflowing.
+
+    urllib3 pools are thread-safe. With pool_block a thread that finds all
+    HTTP_POOL_SIZE connections of a host busy waits for one, instead of
+    opening an extra connection that is thrown away afterwards (the
+    "connection pool is full" warning and a fresh TLS handshake each time).
+    """
+
+    def __init__(self):
+        super().__init__(
+            pool_connections=Config.HTTP_POOL_HOSTS,
+            pool_maxsize=Config.HTTP_POOL_SIZE,
+            pool_block=True,
+            max_retries=0,  # CrawlerEngine._fetch does its own retries
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def stats(self):
+        pools = self.poolmanager.pools
+        with pools.lock:
+            snapshot = list(pools._container.values())
+        stats = {"hosts": len(snapshot), "in_use": 0, "idle": 0, "opened": 0, "requests": 0, "waits": 0}
+        for pool in snapshot:
+            queue = pool.pool
+            if queue is None:
+                continue
+            stats["in_use"] += queue.maxsize - queue.qsize()
+            stats["idle"] += sum(1 for conn in list(queue.queue) if conn is not None)
+            stats["opened"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+            stats["waits"] += pool.waits
+        return stats
+
+
+def create_session():
+    """Session shared by all crawl threads: keep-alive pools per host and cached DNS.
+
+    Only `get` is called on it from several threads; headers are set once
+    here and never changed afterwards.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": Config.USER_AGENT})
+    adapter = PooledAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def session_stats(session):
+    adapter = session.get_adapter("https://")
+    stats = adapter.stats() if isinstance(adapter, PooledAdapter) else {}
+    stats["dns_cache"] = {"hits": dns_cache.hits, "misses": dns_cache.misses}
+    return stats
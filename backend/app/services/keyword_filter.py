@@ -2,6 +2,12 @@
 Keyword filtering service for content filtering by category
 Supports English, French, and Arabic keywords
 """
+import functools
+import re
+import string
+import unicodedata
+
+from app.core.config import Config
 
 KEYWORD_FILTERS = {
     "no_filter": {
@@ -191,34 +197,206 @@ def get_filter_keywords(filter_name):
     return keywords
 
 
-def matches_filter(text, filter_name):
+_ARABIC_RE = re.compile(r"[\u0600-\u06FF]")
+
+# Characters that separate words even without surrounding whitespace
+# (French elision, slashes, dashes used as punctuation)
+_SEPARATORS = ("'", "’", "/", "|", "–", "—")
+# Stripped from both ends of every token
+_PUNCTUATION = string.punctuation + "«»“”‘’…،؛؟"
+
+# Arabic letter variants folded after combining marks are removed: NFKD plus
+# dropping marks already turns أ/إ/آ into ا and removes harakat and shadda
+_AR_LETTERS = str.maketrans({"ٱ": "ا", "ى": "ي", "ـ": None})
+
+# Arabic attaches conjunctions/prepositions and the article to the word and
+# inflects with suffixes. A light stemmer strips them (keeping at least a
+# 3-letter stem) so "والتمويل" and "التمويل" both reduce to "تمويل".
+# Keywords go through the same reduction, so both sides always agree.
+_AR_PROCLITICS = "وفبكل"
+_AR_SUFFIXES = ("ات", "ية", "ين", "ون", "ها", "هم", "ة")
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_token(token):
+    token = token.strip(_PUNCTUATION).casefold()
+    if token.isascii():
+        return token
+
+    # Fold accents ("é" -> "e") and Arabic diacritics by dropping combining marks
+    token = "".join(c for c in unicodedata.normalize("NFKD", token) if not unicodedata.combining(c))
+    token = token.translate(_AR_LETTERS)
+    if not _ARABIC_RE.match(token):
+        return token
+
+    for _ in range(2):
+        if len(token) > 3 and token[0] in _AR_PROCLITICS:
+            token = token[1:]
+    if len(token) > 4 and token.startswith("ال"):
+        token = token[2:]
+    for suffix in _AR_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def _split(text):
+    # Compatibility forms (ligatures, full-width letters) are folded per
+    # distinct token by _normalize_token's NFKD, not over the whole text
+    for sep in _SEPARATORS:
+        text = text.replace(sep, " ")
+    return text.split()
+
+
+def _tokenize(text):
+    return [_normalize_token(t) for t in _split(text)]
+
+
+def _is_acronym(keyword):
+    # "IT", "AI", "ETF", "M&A": casefolded they would collide with
+    # ordinary words ("it", "j'ai"), so they only match as written
+    return " " not in keyword and keyword.isupper() and len(keyword) <= 5
+
+
+class KeywordMatcher:
+    """All keywords of one filter compiled for single-pass, word-level matching.
+
+    Text is split once and every distinct word is normalized once
+    (casefolding, compatibility, accent and Arabic diacritic folding, light
+    Arabic stemming). Single-word keywords are found with one set
+    intersection and phrases are only verified at positions where their
+    first token occurs, when all of their words are present.
+    Matching whole tokens means "IT" no longer matches inside "with".
+    """
+
+    def __init__(self, keywords_by_lang):
+        self.words = {}     # token -> keyword
+        self.acronyms = {}  # token as written -> keyword
+        self.phrases = {}   # first token -> [(tokens, keyword)]
+        self.order = {}     # keyword -> position in the filter definition
+        # Like words, a phrase is kept once even when several keywords (other
+        # languages, spellings or stems) normalize to the same tokens
+        phrases = {}        # tokens -> keyword
+        for keywords in keywords_by_lang.values():
+            for keyword in keywords:
+                self.order.setdefault(keyword, len(self.order))
+                if _is_acronym(keyword):
+                    self.acronyms.setdefault(keyword, keyword)
+                    continue
+                tokens = tuple(_tokenize(keyword))
+                if not tokens:
+                    continue
+                if len(tokens) == 1:
+                    self.words.setdefault(tokens[0], keyword)
+                else:
+                    phrases.setdefault(tokens, keyword)
+        for tokens, keyword in phrases.items():
+            self.phrases.setdefault(tokens[0], []).append((tokens, keyword))
+        self.first_tokens = frozenset(self.words) | frozenset(self.phrases)
+        self.acronym_forms = frozenset(_normalize_token(a) for a in self.acronyms)
+
+    def _scan(self, text):
+        """Map each keyword found in text to its number of occurrences"""
+        raw = _split(text)
+        # Documents repeat words a lot; normalize each distinct word once
+        forms = {t: _normalize_token(t) for t in set(raw)}
+        seen = set(forms.values())
+        found = {}
+
+        if not self.acronym_forms.isdisjoint(seen):
+            for t in forms:
+                keyword = self.acronyms.get(t.strip(_PUNCTUATION))
+                if keyword:
+                    found[keyword] = found.get(keyword, 0) + raw.count(t)
+
+        present = self.first_tokens.intersection(seen)
+        words = present.intersection(self.words)
+        if words:
+            for t, form in forms.items():
+                if form in words:
+                    keyword = self.words[form]
+                    found[keyword] = found.get(keyword, 0) + raw.count(t)
+        if present.isdisjoint(self.phrases):
+            return found
+
+        # Only positions where a phrase can start are checked
+        for t, form in forms.items():
+            if form not in self.phrases:
+                continue
+            # Skip phrases with a word that doesn't occur at all
+            phrases = [p for p in self.phrases[form] if seen.issuperset(p[0])]
+            if not phrases:
+                continue
+            i = -1
+            while True:
+                try:
+                    i = raw.index(t, i + 1)
+                except ValueError:
+                    break
+                for phrase, keyword in phrases:
+                    end = i + len(phrase)
+                    # Most candidates already fail on the second word
+                    if end <= len(raw) and forms[raw[i + 1]] == phrase[1] and \
+                            all(forms[raw[j]] == phrase[j - i] for j in range(i + 2, end)):
+                        found[keyword] = found.get(keyword, 0) + 1
+        return found
+
+    def find(self, text):
+        """Keywords occurring in text, in filter definition order"""
+        return sorted(self._scan(text), key=self.order.__getitem__)
+
+    def score(self, text):
+        """Relevance of text for this filter.
+
+        `hits` counts every occurrence and `distinct` the different keywords;
+        the score favours breadth, so one keyword repeated ten times ranks
+        below four different ones.
+        """
+        found = self._scan(text)
+        hits = sum(found.values())
+        distinct = len(found)
+        return {
+            "score": round(distinct + 0.25 * (hits - distinct), 2),
+            "hits": hits,
+            "distinct": distinct,
+            "keywords": sorted(found, key=self.order.__getitem__),
+        }
+
+
+_MATCHERS = {
+    name: KeywordMatcher(data["keywords"])
+    for name, data in KEYWORD_FILTERS.items()
+    if isinstance(data["keywords"], dict)
+}
+
+
+def get_matcher(filter_name):
+    """Precompiled matcher for a filter, or None for no_filter/unknown filters"""
+    return _MATCHERS.get(filter_name)
+
+
+def find_matches(text, filter_name):
+    """Return the keywords of a filter that occur in text"""
+    matcher = get_matcher(filter_name)
+    return matcher.find(text) if matcher else []
+
+
+def evaluate_filter(text, filter_name, min_score=None):
     """
-    Check if text contains any keywords from the specified filter.
-    Returns True if text matches filter keywords, False otherwise.
-    For 'exclude' filter, returns False if text contains exclude keywords (to exclude it).
+    Score text against a filter and decide whether to keep it.
+    Returns (accepted, relevance); relevance is None when no filter applies.
+    For 'exclude' filter, text is accepted only if it contains no exclude keywords.
+    Other filters accept text whose score reaches min_score (default Config.MIN_RELEVANCE).
     """
-    if filter_name == "no_filter" or not filter_name:
-        return True  # No filter means accept all
-    
-    if filter_name not in KEYWORD_FILTERS:
-        return True  # Unknown filter, accept by default
-    
-    filter_data = KEYWORD_FILTERS[filter_name]
-    text_lower = text.lower()
-    
-    # For exclude filter, we want to exclude content that matches
-    is_exclude = filter_name == "exclude"
-    
-    for lang, keywords in filter_data["keywords"].items():
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                # If exclude filter matches, return False (exclude this content)
-                # If other filter matches, return True (include this content)
-                return not is_exclude
-    
-    # If exclude filter and no matches, include it (return True)
-    # If other filter and no matches, exclude it (return False)
-    return is_exclude
+    matcher = get_matcher(filter_name)
+    if matcher is None:
+        return True, None  # No filter or unknown filter, accept all
+
+    relevance = matcher.score(text)
+    if filter_name == "exclude":
+        return relevance["hits"] == 0, relevance
+    if min_score is None:
+        min_score = Config.MIN_RELEVANCE
+    return relevance["hits"] > 0 and relevance["score"] >= min_score, relevance
 
 
 def get_available_filters():
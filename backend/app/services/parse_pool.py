@@ -0,0 +1,185 @@
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app.core.config import Config
+from app.services.content_parser import ContentParser, PdfBudgetExceeded
+from app.services.keyword_filter import evaluate_filter
+
+_pools = {}  # "parse" | "pdf" -> ProcessPoolExecutor
+_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _pdf_budget(seconds):
+    """Wall-clock alarm and CPU-time kill switch around one PDF.
+
+    Only armed in the main thread of a pool worker. The alarm raises
+    PdfBudgetExceeded so parse_pdf returns what it has; the RLIMIT_CPU soft
+    limit kills a worker stuck inside C code, and submit_parse then replaces
+    the broken PDF pool.
+    """
+    armed = (
+        seconds
+        and resource is not None
+        and hasattr(signal, "setitimer")
+        and multiprocessing.parent_process() is not None
+        and threading.current_thread() is threading.main_thread()
+    )
+    if not armed:
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise PdfBudgetExceeded()
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_limit = int(usage.ru_utime + usage.ru_stime + 2 * seconds) + 1
+    if hard == resource.RLIM_INFINITY or cpu_limit <= hard:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, hard))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def parse_document(ctype: str, content: bytes, encoding: str, url: str, headers: dict,
+                   keyword_filter: str, min_relevance=None):
+    """Parse a fetched body and apply the keyword filter.
+
+    Runs in a worker process, so it only takes and returns plain picklable
+    data. Returns the accepted documents (one for a page, several for a
+    feed) and the links found on an HTML page, which the crawl follows even
+    when the page itself is filtered out.
+    """
+    if ctype == "rss":
+        # Entries are parsed one at a time as the loop below asks for them
+        candidates = ContentParser.parse_rss(content, url, headers)
+    elif ctype == "pdf":
+        with _pdf_budget(Config.PDF_TIME_BUDGET):
+            candidates = [ContentParser.parse_pdf(content, url, time_budget=Config.PDF_TIME_BUDGET)]
+    else:
+        text = content.decode(encoding or "utf-8", errors="replace")
+        if ctype == "xml":
+            parsed = ContentParser.parse_xml(text, url)
+        elif ctype == "txt":
+            parsed = ContentParser.parse_text(text, url)
+        else:
+            parsed = ContentParser.parse_html(text, url)
+        parsed["url"] = url
+        candidates = [parsed]
+
+    links = candidates[0].get("links", []) if ctype == "html" and candidates else []
+    limit = Config.MAX_FEED_ITEMS if ctype == "rss" else None
+    accepted = []
+    for doc in candidates:
+        content_text = f"{doc.get('title', '')} {doc.get('content', '')} {doc.get('description', '')}"
+        ok, relevance = evaluate_filter(content_text, keyword_filter, min_relevance)
+        if not ok:
+            continue
+        if relevance:
+            doc["relevance"] = relevance
+        accepted.append(doc)
+        if limit and len(accepted) >= limit:
+            break
+    return accepted, links
+
+
+def _get_pool(kind: str = "parse"):
+    with _pool_lock:
+        if kind not in _pools:
+            # spawn, not fork: the API process holds threads and Mongo sockets
+            workers = Config.PDF_WORKERS if kind == "pdf" else Config.PARSE_WORKERS
+            _pools[kind] = ProcessPoolExecutor(
+                max_workers=max(workers, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pools[kind]
+
+
+def _submit(kind: str, args, retry: bool = False):
+    pool = _get_pool(kind)
+    try:
+        inner = pool.submit(parse_document, *args)
+    except BrokenProcessPool:
+        _replace(kind, pool)
+        inner = _get_pool(kind).submit(parse_document, *args)
+    if not retry:
+        return inner
+
+    # A killed PDF worker breaks its pool and fails every PDF in it. Each of
+    # them is run once more in a one-off process of its own, so the PDF that
+    # was killed can't take the others down again.
+    outer = Future()
+
+    def _done(f):
+        # Claims outer, so a late cancel() can't race the result
+        if not outer.set_running_or_notify_cancel():
+            return
+        try:
+            outer.set_result(f.result())
+        except BrokenProcessPool:
+            _replace(kind, pool)
+            threading.Thread(target=_run_alone, args=(args, outer), daemon=True).start()
+        except BaseException as e:
+            outer.set_exception(e)
+
+    inner.add_done_callback(_done)
+    return outer
+
+
+def _run_alone(args, future: Future):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        try:
+            future.set_result(pool.submit(parse_document, *args).result())
+        except BaseException as e:
+            future.set_exception(e)
+
+
+def _replace(kind: str, pool):
+    with _pool_lock:
+        if _pools.get(kind) is pool:
+            print(f"{kind.upper()} pool broken, starting a new one")
+            del _pools[kind]
+
+
+def submit_parse(*args):
+    """Queue parse_document on the shared process pool.
+
+    PDFs go to a separate pool of PDF_WORKERS processes, so a worker killed
+    for running over the PDF budget can't fail the HTML and feed parses of
+    other runs. With PARSE_WORKERS = 0 parsing runs inline and an already
+    completed future is returned; PDFs still go to their pool so the time
+    budget can be enforced. A pool broken by a crashed worker is replaced.
+    """
+    if args[0] == "pdf":
+        return _submit("pdf", args, retry=True)
+
+    if Config.PARSE_WORKERS <= 0:
+        future = Future()
+        try:
+            future.set_result(parse_document(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return _submit("parse", args)
+
+
+def shutdown():
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False)
+        _pools.clear()
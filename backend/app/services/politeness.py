@@ -0,0 +1,165 @@
+import threading
+import time
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from app.core.config import Config
+from app.services.retry import sleep_unless_stopped
+
+
+def host_of(url: str):
+    """scheme://host[:port], the unit politeness and robots.txt apply to"""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class RobotsCache:
+    """robots.txt rules per host, fetched on first use and kept for Config.ROBOTS_TTL seconds.
+
+    A missing robots.txt (4xx) allows everything, while 401/403 disallows
+    everything like urllib's RobotFileParser.read does. When it can't be fetched
+    (network error, 5xx) everything is allowed too, but the result is only
+    cached for a minute so the file is tried again soon.
+    """
+
+    def __init__(self, session=None, ttl: int = None):
+        self.session = session or requests.Session()
+        self.ttl = Config.ROBOTS_TTL if ttl is None else ttl
+        self.fetches = 0
+        self._entries = {}  # host -> (parser, expires_at)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _host_lock(self, host: str):
+        with self._lock:
+            return self._locks.setdefault(host, threading.Lock())
+
+    def _load(self, host: str):
+        parser = RobotFileParser(host + "/robots.txt")
+        ttl = self.ttl
+        self.fetches += 1
+        try:
+            r = self.session.get(
+                host + "/robots.txt",
+                timeout=Config.TIMEOUT,
+                headers={"User-Agent": Config.USER_AGENT},
+            )
+            if r.status_code >= 500:
+                parser.allow_all = True
+                ttl = min(ttl, 60)
+            elif r.status_code in (401, 403):
+                parser.disallow_all = True
+            elif r.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(r.text.splitlines())
+        except requests.RequestException as e:
+            print(f"Could not fetch robots.txt for {host}: {e}")
+            parser.allow_all = True
+            ttl = min(ttl, 60)
+        return parser, time.monotonic() + ttl
+
+    def rules(self, url: str):
+        host = host_of(url)
+        entry = self._entries.get(host)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        # One fetch per host even when several runs ask at once
+        with self._host_lock(host):
+            entry = self._entries.get(host)
+            if not entry or entry[1] <= time.monotonic():
+                entry = self._load(host)
+                self._entries[host] = entry
+        return entry[0]
+
+    def allowed(self, url: str):
+        return self.rules(url).can_fetch(Config.USER_AGENT, url)
+
+    def crawl_delay(self, url: str):
+        rules = self.rules(url)
+        delay = rules.crawl_delay(Config.USER_AGENT)
+        rate = rules.request_rate(Config.USER_AGENT)
+        if rate and rate.requests:
+            delay = max(delay or 0, rate.seconds / rate.requests)
+        # Some sites ask for minutes between requests; cap what we honor
+        return min(float(delay or 0), Config.MAX_CRAWL_DELAY)
+
+
+class HostThrottle:
+    """Token bucket per host, shared by every run crawling that host.
+
+    Each host earns one token per `delay` seconds. The delay is the largest
+    of Config.MIN_HOST_DELAY, the source's request_delay and the host's
+    Crawl-delay. Only at the MIN_HOST_DELAY floor may a host hold up to
+    Config.HOST_BURST tokens; a delay the source or the site asked for is
+    kept between every two requests. The bucket is kept as the time the next token is due (GCRA),
+    so a request reserves its slot under the lock and sleeps outside it.
+    """
+
+    def __init__(self, burst: int = None):
+        self.burst = burst or Config.HOST_BURST
+        self.waits = 0
+        self.waited = 0.0
+        self._next = {}  # host -> theoretical arrival time
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str, delay: float, burst: int = None):
+        """Claim the next slot for host; returns how many seconds to wait for it"""
+        burst = burst or self.burst
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._next.get(host, now), now)
+            start = max(now, tat - (burst - 1) * delay)
+            self._next[host] = max(tat, start) + delay
+            if len(self._next) > 10000:
+                # Forget hosts whose buckets are full again
+                self._next = {h: t for h, t in self._next.items() if t > now}
+        return start - now
+
+    def defer(self, host: str, seconds: float):
+        """Hold every request to host back for `seconds`, e.g. after a Retry-After"""
+        with self._lock:
+            self._next[host] = max(self._next.get(host, 0), time.monotonic() + seconds)
+
+    def wait(self, url: str, delay: float, stop_check=None):
+        """Sleep until the host of url may be requested again; False if stopped meanwhile"""
+        if delay > Config.MIN_HOST_DELAY:
+            # request_delay or Crawl-delay: no back-to-back requests
+            pause = self.reserve(host_of(url), delay, burst=1)
+        else:
+            pause = self.reserve(host_of(url), Config.MIN_HOST_DELAY)
+        if pause <= 0:
+            return True
+        self.waits += 1
+        self.waited += pause
+        return sleep_unless_stopped(pause, stop_check)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            busy = sum(1 for t in self._next.values() if t > now)
+        return {"hosts": len(self._next), "throttled_hosts": busy, "waits": self.waits,
+                "waited_seconds": round(self.waited, 1)}
+
+
+class Politeness:
+    """robots.txt and per-host rate limits for all runs of a CrawlerRunner"""
+
+    def __init__(self, session=None):
+        self.robots = RobotsCache(session)
+        self.throttle = HostThrottle()
+
+    def allowed(self, url: str, respect_robots: bool = True):
+        return not respect_robots or self.robots.allowed(url)
+
+    def wait(self, url: str, request_delay: float = 0, respect_robots: bool = True, stop_check=None):
+        delay = float(request_delay or 0)
+        if respect_robots:
+            delay = max(delay, self.robots.crawl_delay(url))
+        return self.throttle.wait(url, delay, stop_check)
+
+    def stats(self):
+        return {**self.throttle.stats(), "robots_cached": len(self.robots._entries),
+                "robots_fetches": self.robots.fetches}
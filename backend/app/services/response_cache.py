@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+from app.core.config import Config
+
+
+class ResponseCache:
+    """Results of read endpoints kept for Config.RESPONSE_CACHE_TTL seconds.
+
+    Keys are (name, source_id) tuples, source_id None for results that cover
+    every source. Concurrent requests for a key that isn't cached share one
+    computation (single flight); it runs as its own task so a client that
+    disconnects doesn't cancel it for the others. The runner invalidates a
+    source when a run is queued, starts, stops or finishes; a computation
+    that was running when that happened is handed to its waiters but not
+    cached.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = Config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self._entries = {}   # key -> (expires_at, value)
+        self._inflight = {}  # (key, generation) -> task
+        self._generation = 0
+        self._lock = threading.Lock()  # invalidate() is called from crawl threads
+
+    async def get(self, key: tuple, compute):
+        """Cached value of key, else the result of `await compute()`"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        flight = (key, self._generation)
+        task = self._inflight.get(flight)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(flight, compute))
+            self._inflight[flight] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _compute(self, flight: tuple, compute):
+        key, generation = flight
+        try:
+            value = await compute()
+            with self._lock:
+                if generation == self._generation and self.ttl > 0:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            self._inflight.pop(flight, None)
+
+    def invalidate(self, source_id: str = None):
+        """Drop the entries of a source and those covering all sources; everything without source_id"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if source_id is None:
+                self._entries = {}
+            else:
+                self._entries = {k: v for k, v in self._entries.items() if k[1] not in (None, source_id)}
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else None,
+        }
+
+
+# Shared by the API handlers and the runner
+response_cache = ResponseCache()
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.core.config import Config
+
+# Statuses worth asking again; any other 4xx/5xx fails the URL at once
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def sleep_unless_stopped(seconds: float, stop_check=None):
+    """Sleep in short steps; returns False as soon as stop_check() is true"""
+    deadline = time.monotonic() + seconds
+    while True:
+        if stop_check and stop_check():
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, 0.2))
+
+
+def backoff_delay(attempt: int):
+    """Exponential backoff with full jitter: uniform in [0, RETRY_DELAY * 2^attempt]"""
+    return random.uniform(0, min(Config.RETRY_MAX_DELAY, Config.RETRY_DELAY * 2 ** attempt))
+
+
+def retry_after(headers):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None"""
+    value = (headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        seconds = int(value)
+    else:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return max(0.0, min(float(seconds), Config.MAX_RETRY_AFTER))
+
+
+class CircuitBreaker:
+    """Stops requests to a host after BREAKER_THRESHOLD consecutive failures.
+
+    A failure is a connection error or timeout, or a URL that still gets a
+    5xx after all retries. Shared by all runs. An open circuit refuses
+    requests for BREAKER_COOLDOWN seconds, then lets a single trial request
+    through; another failure keeps it open for twice as long (up to 16x),
+    any response closes it.
+    """
+
+    def __init__(self, threshold: int = None, cooldown: float = None):
+        self.threshold = threshold or Config.BREAKER_THRESHOLD
+        self.cooldown = Config.BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.rejected = 0
+        self._hosts = {}  # host -> {"failures", "open_until"}
+        self._lock = threading.Lock()
+
+    def allow(self, host: str):
+        with self._lock:
+            state = self._hosts.get(host)
+            if not state or state["failures"] < self.threshold:
+                return True
+            now = time.monotonic()
+            if now < state["open_until"]:
+                self.rejected += 1
+                return False
+            # Half-open: this request is the trial, everyone else keeps waiting
+            state["open_until"] = now + self.cooldown
+            return True
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            state = self._hosts.setdefault(host, {"failures": 0, "open_until": 0})
+            state["failures"] += 1
+            extra = state["failures"] - self.threshold
+            if extra >= 0:
+                state["open_until"] = time.monotonic() + self.cooldown * 2 ** min(extra, 4)
+                if extra == 0:
+                    print(f"Circuit open for {host} after {state['failures']} consecutive failures")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            open_hosts = sorted(h for h, s in self._hosts.items()
+                                if s["failures"] >= self.threshold and s["open_until"] > now)
+        return {"open": len(open_hosts), "open_hosts": open_hosts[:20], "rejected": self.rejected}
@@ -1,16 +1,39 @@
+import heapq
+import itertools
 import threading
 from datetime import datetime
 from bson import ObjectId
 
+from app.core.config import Config
 from app.services.crawler_engine import CrawlerEngine
+from app.services.events import events
+from app.services.http_client import session_stats
+from app.services.response_cache import response_cache
+
+# Lower value runs first; runs with the same priority are served in arrival order
+PRIORITY_MANUAL = 0
+PRIORITY_SCHEDULED = 10
+
 
 class CrawlerRunner:
-    def __init__(self, db):
+    def __init__(self, db, workers: int = None):
         self.db = db
+        # One engine, so robots.txt rules and per-host rate limits are shared by all runs
         self.engine = CrawlerEngine(db)
+        self.politeness = self.engine.politeness
         self._locks = threading.Lock()
+        self._wakeup = threading.Condition(self._locks)
         self._stops = {}
-        self._threads = {}
+        self._pending = []  # heap of (priority, seq, source_id, run_id)
+        self._seq = itertools.count()
+        self._queued = {}   # source_id -> run_id waiting for a worker (None while start() creates it)
+        self._running = {}  # source_id -> run_id currently crawling
+
+        self._workers = []
+        for i in range(workers or Config.MAX_CONCURRENT_RUNS):
+            t = threading.Thread(target=self._worker, name=f"crawl-worker-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
 
     def _get_stop_event(self, source_id: str):
         with self._locks:
@@ -18,124 +41,259 @@ class CrawlerRunner:
                 self._stops[source_id] = threading.Event()
             return self._stops[source_id]
 
-    def start(self, source_id: str):
+    def start(self, source_id: str, priority: int = PRIORITY_MANUAL):
         source = self.db.sources.find_one({"_id": ObjectId(source_id)})
         if not source:
             return None, "Source not found"
 
+        # Check and reserve in one step so concurrent starts can't both pass
         with self._locks:
-            if source_id in self._threads and self._threads[source_id].is_alive():
+            if source_id in self._running:
                 return None, "Already running"
-
-        stop_event = self._get_stop_event(source_id)
-        stop_event.clear()
+            if source_id in self._queued:
+                return None, "Already queued"
+            self._queued[source_id] = None
+            self._stops.setdefault(source_id, threading.Event()).clear()
 
         run_doc = {
             "source_id": source_id,
             "source_url": source["url"],
-            "status": "running",
-            "started_at": datetime.now(),
+            "status": "queued",
+            "queued_at": datetime.now(),
+            "started_at": None,
+            "finished_at": None,
+            "crawled_count": 0,
+            "new_count": 0,
+            "updated_count": 0,
+            "unchanged_count": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "seen_skipped": 0,
+            "priority": priority,
+        }
+        try:
+            run_id = str(self.db.crawl_runs.insert_one(run_doc).inserted_id)
+        except Exception:
+            with self._locks:
+                if self._queued.get(source_id) is None:
+                    self._queued.pop(source_id, None)
+            raise
+
+        with self._wakeup:
+            self._queued[source_id] = run_id
+            heapq.heappush(self._pending, (priority, next(self._seq), source_id, run_id))
+            self._wakeup.notify()
+
+        # The source carries a summary of its latest run, kept current by the
+        # runner and the writer, so listing sources is a single query
+        last_run = {
+            "run_id": run_id,
+            "status": "queued",
+            "queued_at": run_doc["queued_at"],
+            "started_at": None,
             "finished_at": None,
             "crawled_count": 0,
+            "new_count": 0,
+            "updated_count": 0,
+            "unchanged_count": 0,
         }
-        run_id = str(self.db.crawl_runs.insert_one(run_doc).inserted_id)
+        self.db.sources.update_one(
+            {"_id": ObjectId(source_id)},
+            {"$set": {"runtime_status": "queued", "last_run": last_run}},
+        )
+        response_cache.invalidate(source_id)
+        events.publish("queued", source_id, run_id=run_id, priority=priority, queued_at=last_run["queued_at"])
+        return run_id, None
+
+    def _worker(self):
+        while True:
+            with self._wakeup:
+                while not self._pending:
+                    self._wakeup.wait()
+                _, _, source_id, run_id = heapq.heappop(self._pending)
+                if self._queued.get(source_id) != run_id:
+                    continue  # Cancelled while waiting
+                del self._queued[source_id]
+                self._running[source_id] = run_id
+
+            try:
+                self._run(source_id, run_id)
+            finally:
+                with self._locks:
+                    self._running.pop(source_id, None)
+
+    def _run(self, source_id: str, run_id: str):
+        stop_event = self._get_stop_event(source_id)
 
         def stop_check():
             return stop_event.is_set()
 
-        def job():
-            try:
-                result = self.engine.crawl(source, run_id, stop_check)
-                final_status = "stopped" if result.get("stopped") else "finished"
-                crawled_count = result.get("crawled_count", 0)
-            except Exception as e:
-                # Log error and mark as failed
-                print(f"Error in crawler job for {source_id}: {e}")
-                import traceback
-                traceback.print_exc()
-                final_status = "failed"
-                crawled_count = 0
-            
-            try:
-                # Always update run status, even if there was an error
-                self.db.crawl_runs.update_one(
-                    {"_id": ObjectId(run_id)},
-                    {
-                        "$set": {
-                            "status": final_status,
-                            "finished_at": datetime.now(),
-                            "crawled_count": crawled_count,
-                        }
-                    },
-                )
-                self.db.sources.update_one(
-                    {"_id": ObjectId(source_id)},
-                    {
-                        "$set": {
-                            "last_crawled": datetime.now(),
-                            "runtime_status": "idle"
-                        },
-                        "$inc": {"crawl_count": 1}
-                    },
-                )
-            except Exception as e:
-                print(f"Error updating database for {source_id}: {e}")
-            
-            # Clean up thread reference
-            with self._locks:
-                if source_id in self._threads:
-                    del self._threads[source_id]
+        crawled_count = 0
+        result = {}
+        try:
+            source = self.db.sources.find_one({"_id": ObjectId(source_id)})
+            if not source:
+                raise RuntimeError("Source was deleted while queued")
 
-        t = threading.Thread(target=job, daemon=True)
-        with self._locks:
-            self._threads[source_id] = t
-        t.start()
+            started_at = datetime.now()
+            self.db.crawl_runs.update_one(
+                {"_id": ObjectId(run_id)},
+                {"$set": {"status": "running", "started_at": started_at}},
+            )
+            self.db.sources.update_one(
+                {"_id": ObjectId(source_id)},
+                {"$set": {"runtime_status": "running", "last_run.status": "running", "last_run.started_at": started_at}},
+            )
+            response_cache.invalidate(source_id)
+            events.publish("started", source_id, run_id=run_id, started_at=started_at)
 
-        self.db.sources.update_one({"_id": ObjectId(source_id)}, {"$set": {"runtime_status": "running"}})
-        return run_id, None
+            result = self.engine.crawl(source, run_id, stop_check)
+            final_status = "stopped" if result.get("stopped") else "finished"
+            crawled_count = result.get("crawled_count", 0)
+        except Exception as e:
+            # Log error and mark as failed
+            print(f"Error in crawler job for {source_id}: {e}")
+            import traceback
+            traceback.print_exc()
+            final_status = "failed"
+            events.publish("error", source_id, run_id=run_id, error=str(e))
+
+        finished_at = datetime.now()
+        try:
+            # Always update run status, even if there was an error
+            self.db.crawl_runs.update_one(
+                {"_id": ObjectId(run_id)},
+                {
+                    "$set": {
+                        "status": final_status,
+                        "finished_at": finished_at,
+                        "crawled_count": crawled_count,
+                        "cache_hits": result.get("cache_hits", 0),
+                        "cache_misses": result.get("cache_misses", 0),
+                        "seen_skipped": result.get("seen_skipped", 0),
+                    }
+                },
+            )
+            self.db.sources.update_one(
+                {"_id": ObjectId(source_id)},
+                {
+                    "$set": {
+                        "last_crawled": finished_at,
+                        "runtime_status": "idle",
+                        "last_run.status": final_status,
+                        "last_run.finished_at": finished_at,
+                        "last_run.crawled_count": crawled_count,
+                    },
+                    "$inc": {"crawl_count": 1}
+                },
+            )
+        except Exception as e:
+            print(f"Error updating database for {source_id}: {e}")
+        response_cache.invalidate(source_id)
+        events.publish(
+            "finished",
+            source_id,
+            run_id=run_id,
+            status=final_status,
+            finished_at=finished_at,
+            crawled_count=crawled_count,
+        )
 
     def stop(self, source_id: str):
         stop_event = self._get_stop_event(source_id)
         stop_event.set()
-        self.db.sources.update_one({"_id": ObjectId(source_id)}, {"$set": {"runtime_status": "stopping"}})
+
+        # A run still waiting for a worker is cancelled outright; one that
+        # start() is still creating sees the stop event as soon as it runs
+        with self._locks:
+            queued_run_id = self._queued.get(source_id)
+            if queued_run_id:
+                del self._queued[source_id]
+
+        if queued_run_id:
+            finished_at = datetime.now()
+            self.db.crawl_runs.update_one(
+                {"_id": ObjectId(queued_run_id)},
+                {"$set": {"status": "stopped", "finished_at": finished_at}},
+            )
+            self.db.sources.update_one(
+                {"_id": ObjectId(source_id)},
+                {"$set": {"runtime_status": "idle", "last_run.status": "stopped", "last_run.finished_at": finished_at}},
+            )
+            response_cache.invalidate(source_id)
+            events.publish("finished", source_id, run_id=queued_run_id, status="stopped", finished_at=finished_at,
+                           crawled_count=0)
+        else:
+            self.db.sources.update_one({"_id": ObjectId(source_id)}, {"$set": {"runtime_status": "stopping"}})
+            response_cache.invalidate(source_id)
+            events.publish("stopping", source_id)
         return True
 
+    def snapshot(self):
+        """{"running", "queued"} of every source the pool currently holds a run for"""
+        with self._locks:
+            statuses = {source_id: {"running": True, "queued": 0} for source_id in self._running}
+            # 1-based position among runs still waiting for a worker
+            live = sorted(p for p in self._pending if self._queued.get(p[2]) == p[3])
+            for position, p in enumerate(live, 1):
+                statuses[p[2]] = {"running": False, "queued": position}
+        return statuses
+
     def status(self, source_id: str):
+        return self.snapshot().get(source_id, {"running": False, "queued": 0})
+
+    def stats(self):
+        """Snapshot of the shared worker pool and its queue"""
         with self._locks:
-            t = self._threads.get(source_id)
-        running = bool(t and t.is_alive())
-        
-        # Clean up dead threads and update status
-        if not running and source_id in self._threads:
-            # Thread died unexpectedly, clean up
-            del self._threads[source_id]
+            running = len(self._running)
+            waiting = len(self._queued)
+            alive = sum(1 for t in self._workers if t.is_alive())
+
+        return {
+            "workers": len(self._workers),
+            "workers_alive": alive,
+            "running": running,
+            "waiting": waiting,
+            "queue_depth": waiting,
+            "idle_workers": max(alive - running, 0),
+            "politeness": self.politeness.stats(),
+            "circuit_breaker": self.engine.breaker.stats(),
+            "http_pool": session_stats(self.engine.session),
+            "events": events.stats(),
+        }
+
+    def cleanup_stuck_threads(self):
+        """Close out runs Mongo shows as queued/running that no worker owns.
+
+        Left behind by a restart or crash mid-run: the run is marked failed,
+        or stopped if a stop was requested, and the source reset to idle.
+        """
+        # Runs queued from here on are not ours to close
+        now = datetime.now()
+        stuck = self.db.sources.find(
+            {"runtime_status": {"$in": ["queued", "running", "stopping"]}},
+            {"_id": 1, "runtime_status": 1, "last_run.run_id": 1},
+        )
+        for source in stuck:
+            source_id = str(source["_id"])
+            with self._locks:
+                if source_id in self._running or source_id in self._queued:
+                    continue
+            status = "stopped" if source["runtime_status"] == "stopping" else "failed"
+            run_id = (source.get("last_run") or {}).get("run_id")
+            updates = {"runtime_status": "idle"}
+            if run_id:
+                updates.update({"last_run.status": status, "last_run.finished_at": now})
             try:
-                # Update database status to idle if thread is dead
-                source = self.db.sources.find_one({"_id": ObjectId(source_id)})
-                if source and source.get("runtime_status") in ["running", "stopping"]:
-                    self.db.sources.update_one(
-                        {"_id": ObjectId(source_id)},
-                        {"$set": {"runtime_status": "idle"}}
-                    )
+                self.db.crawl_runs.update_many(
+                    {"source_id": source_id, "status": {"$in": ["queued", "running"]}, "queued_at": {"$lt": now}},
+                    {"$set": {"status": status, "finished_at": now}},
+                )
+                # Unless a new run has taken over the source meanwhile
+                self.db.sources.update_one(
+                    {"_id": source["_id"], "runtime_status": source["runtime_status"], "last_run.run_id": run_id},
+                    {"$set": updates},
+                )
+                response_cache.invalidate(source_id)
             except Exception as e:
-                print(f"Error cleaning up thread for {source_id}: {e}")
-        
-        return {"running": running}
-    
-    def cleanup_stuck_threads(self):
-        """Clean up threads that are marked as running but the thread is dead"""
-        with self._locks:
-            dead_threads = []
-            for source_id, thread in list(self._threads.items()):
-                if not thread.is_alive():
-                    dead_threads.append(source_id)
-            
-            for source_id in dead_threads:
-                del self._threads[source_id]
-                try:
-                    self.db.sources.update_one(
-                        {"_id": ObjectId(source_id)},
-                        {"$set": {"runtime_status": "idle"}}
-                    )
-                except Exception as e:
-                    print(f"Error cleaning up stuck thread {source_id}: {e}")
\ No newline at end of file
+                print(f"Error cleaning up stuck source {source_id}: {e}")
@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import random
+import threading
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+from app.core.config import Config
+from app.services.runner import PRIORITY_SCHEDULED
+
+# Fields needed to (re)compute a source's next run
+_SCHEDULE_FIELDS = {"frequency": 1, "status": 1, "last_crawled": 1, "next_run_at": 1}
+
+
+class PeriodicScheduler:
+    """Triggers recurring crawls from each source's `frequency` (seconds).
+
+    Due times live in an in-memory heap so nothing polls the sources
+    collection; `next_run_at` is persisted on the source so restarts pick up
+    where they left off.
+    """
+
+    def __init__(self, db, runner):
+        self.db = db
+        self.runner = runner
+        self._cv = threading.Condition()
+        self._heap = []     # (next_run_at, seq, source_id)
+        self._entries = {}  # source_id -> seq of its live heap entry
+        self._seq = itertools.count()
+        self._thread = None
+
+    def _frequency(self, source: dict):
+        try:
+            frequency = int(source.get("frequency") or 0)
+        except (TypeError, ValueError):
+            return None
+        if frequency <= 0:
+            return None
+        return max(frequency, Config.MIN_FREQUENCY)
+
+    def _jitter(self, frequency: int):
+        return timedelta(seconds=random.uniform(0, frequency * Config.SCHEDULE_JITTER))
+
+    def load(self):
+        """Build the heap once from every source that has a frequency"""
+        now = datetime.now()
+        sources = self.db.sources.find(
+            # Not {"$gt": 0}: that skips frequencies stored as strings
+            {"frequency": {"$nin": [None, 0, ""]}, "status": {"$ne": "inactive"}},
+            _SCHEDULE_FIELDS,
+        )
+        for source in sources:
+            frequency = self._frequency(source)
+            if not frequency:
+                continue
+            next_run_at = source.get("next_run_at")
+            if next_run_at is None and source.get("last_crawled"):
+                next_run_at = source["last_crawled"] + timedelta(seconds=frequency)
+            if next_run_at is None or next_run_at < now:
+                # Overdue (or never run): spread them out instead of firing all at once
+                next_run_at = now + self._jitter(frequency)
+            self._push(str(source["_id"]), next_run_at, persist=source.get("next_run_at") != next_run_at)
+
+    def schedule(self, source: dict):
+        """(Re)schedule a source after it was created or its settings changed"""
+        source_id = str(source["_id"])
+        frequency = self._frequency(source)
+        if not frequency or source.get("status") == "inactive":
+            self.unschedule(source_id)
+            return None
+
+        base = source.get("last_crawled") or datetime.now()
+        next_run_at = max(base + timedelta(seconds=frequency), datetime.now()) + self._jitter(frequency)
+        self._push(source_id, next_run_at)
+        return next_run_at
+
+    def unschedule(self, source_id: str):
+        with self._cv:
+            self._entries.pop(source_id, None)
+        self.db.sources.update_one({"_id": ObjectId(source_id)}, {"$set": {"next_run_at": None}})
+
+    def _push(self, source_id: str, next_run_at: datetime, persist: bool = True):
+        with self._cv:
+            seq = next(self._seq)
+            self._entries[source_id] = seq  # Older heap entries become stale
+            heapq.heappush(self._heap, (next_run_at, seq, source_id))
+            self._cv.notify()
+        if persist:
+            self.db.sources.update_one({"_id": ObjectId(source_id)}, {"$set": {"next_run_at": next_run_at}})
+
+    def _next_due(self):
+        """Block until the earliest live entry is due, then pop it"""
+        with self._cv:
+            while True:
+                if not self._heap:
+                    self._cv.wait()
+                    continue
+                next_run_at, seq, source_id = self._heap[0]
+                if self._entries.get(source_id) != seq:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = (next_run_at - datetime.now()).total_seconds()
+                if delay > 0:
+                    # Woken early whenever an earlier entry is pushed
+                    self._cv.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                del self._entries[source_id]
+                return source_id
+
+    def _trigger(self, source_id: str):
+        source = self.db.sources.find_one({"_id": ObjectId(source_id)}, _SCHEDULE_FIELDS)
+        if not source:
+            return
+        frequency = self._frequency(source)
+        if not frequency or source.get("status") == "inactive":
+            self.unschedule(source_id)
+            return
+
+        _, err = self.runner.start(source_id, priority=PRIORITY_SCHEDULED)
+        if err:
+            print(f"Scheduled crawl for {source_id} skipped: {err}")
+
+        self._push(source_id, datetime.now() + timedelta(seconds=frequency) + self._jitter(frequency))
+
+    def _loop(self):
+        while True:
+            source_id = self._next_due()
+            try:
+                self._trigger(source_id)
+            except Exception as e:
+                print(f"Error triggering scheduled crawl for {source_id}: {e}")
+                # Keep the source in the heap and try again later
+                self._push(source_id, datetime.now() + timedelta(seconds=Config.MIN_FREQUENCY), persist=False)
+
+    def start(self):
+        self.load()
+        self._thread = threading.Thread(target=self._loop, name="periodic-scheduler", daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        with self._cv:
+            live = [entry for entry in self._heap if self._entries.get(entry[2]) == entry[1]]
+        return {
+            "scheduled": len(live),
+            "next_run_at": min(live)[0] if live else None,
+        }
@@ -0,0 +1,80 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that only track where a click came from
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_hsenc", "_hsmi", "ref_src", "cmpid", "xtor",
+}
+
+
+def _is_tracking_param(name: str):
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def normalize_url(url: str):
+    """Canonical form used to decide whether two URLs are the same page.
+
+    Raises ValueError for URLs that can't be parsed (bad port or IPv6 host).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    # "/news/" and "/news" are the same page on practically every site
+    path = parts.path.rstrip("/") or "/"
+    query = ""
+    if parts.query:
+        params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+        query = urlencode(sorted(params))
+    # Fragments never reach the server
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_fingerprint(url: str):
+    """Stable hex digest of the normalized URL, used as the dedup key"""
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def url_key(url: str):
+    """64-bit integer fingerprint of the normalized URL, for in-memory visited sets"""
+    digest = hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def base_domain(host: str):
+    """Host without a leading "www.", the domain whose subdomains a crawl may include"""
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def in_scope(url: str, seed_url: str, scope: str = "domain", include_subdomains: bool = True):
+    """Whether a discovered link belongs to the crawl started at seed_url.
+
+    scope is "domain" (the seed's host, plus its subdomains when
+    include_subdomains is set), "path" (the same, restricted to the seed's
+    path prefix) or "any" (every http(s) link).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return False
+    if scope == "any":
+        return True
+
+    seed = urlsplit(seed_url)
+    host = (parts.hostname or "").lower()
+    seed_host = (seed.hostname or "").lower()
+    domain = base_domain(seed_host)
+    if host != seed_host and base_domain(host) != domain:
+        if not (include_subdomains and host.endswith("." + domain)):
+            return False
+
+    if scope == "path":
+        prefix = seed.path.rsplit("/", 1)[0] + "/"
+        return (parts.path or "/").startswith(prefix)
+    return True
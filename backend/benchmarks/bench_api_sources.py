@@ -0,0 +1,199 @@
+"""
+Load benchmark: latency of GET /api/sources with 1,000 sources and 50
+concurrent clients, for the async handlers (async MongoDB client) and for
+the previous blocking handlers that ran on FastAPI's threadpool.
+
+While the load runs a single probe client keeps calling GET /api/scheduler,
+the kind of cheap request (like /start and /stop) that used to queue behind
+the listing for a free thread.
+
+Needs a MongoDB server (MONGODB_URI); the sources are written to a scratch
+database that is dropped afterwards. Run from the backend directory:
+    python -m benchmarks.bench_api_sources [sources] [clients] [requests_per_client]
+"""
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+import httpx
+import uvicorn
+from fastapi import APIRouter, FastAPI, Request
+from pymongo import AsyncMongoClient, MongoClient
+
+from app.api.routes import _run_progress, router
+from app.core.config import Config
+from app.services.runner import CrawlerRunner
+from app.services.scheduler import PeriodicScheduler
+
+DATABASE = "crawler_dashboard_bench"
+SOURCES = 1000
+CLIENTS = 50
+REQUESTS_PER_CLIENT = 20
+PROBE_INTERVAL = 0.05
+
+
+legacy_router = APIRouter()
+
+
+@legacy_router.get("/sources")
+def legacy_list_sources(request: Request):
+    """The blocking handler this benchmark compares against"""
+    db = request.app.state.db
+    runtime = request.app.state.runner.snapshot()
+    sources = []
+    for s in db.sources.find().sort("created_at", -1):
+        s["id"] = str(s.pop("_id"))
+        status = runtime.get(s["id"], {"running": False, "queued": 0})
+        current_run_crawled, runtime_seconds, rate = _run_progress(s.get("last_run") or {}, status["running"])
+        s["stats"] = {"pages": s.get("total_pages", 0), "pages_crawled": current_run_crawled,
+                      "queued": status["queued"], "rate": rate, "runtime_seconds": runtime_seconds}
+        sources.append(s)
+    return sources
+
+
+@legacy_router.get("/scheduler")
+def legacy_scheduler_stats(request: Request):
+    return {**request.app.state.runner.stats(), "periodic": request.app.state.scheduler.stats()}
+
+
+def seed(db, count):
+    db.sources.drop()
+    now = datetime.now()
+    db.sources.insert_many([
+        {
+            "url": f"https://example{i}.com/news",
+            "name": f"Source {i}",
+            "source_type": "html",
+            "keyword_filter": "no_filter",
+            "frequency": 3600,
+            "max_hits": 50,
+            "status": "active",
+            "created_at": now,
+            "total_pages": i * 7,
+            "runtime_status": "idle",
+            "last_run": {"run_id": f"run{i}", "status": "completed", "started_at": now, "finished_at": now,
+                         "crawled_count": 50, "new_count": 5, "updated_count": 2, "unchanged_count": 43},
+        }
+        for i in range(count)
+    ])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app):
+    """Run app with uvicorn on a background thread; returns (base url, server, thread)"""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def load(base, clients, requests_per_client):
+    latencies = []
+    probes = []
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as http:
+        async def client():
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                response = await http.get("/api/sources")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await http.get("/api/scheduler")).raise_for_status()
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        await http.get("/api/sources")  # Warm up connections and caches
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+    return latencies, probes, elapsed
+
+
+def report(name, latencies, probes, elapsed):
+    ms = [x * 1000 for x in latencies]
+    probe_ms = [x * 1000 for x in probes] or [0]
+    print(f"{name:<8}{percentile(ms, 50):>9.1f}{percentile(ms, 99):>9.1f}{statistics.mean(ms):>9.1f}"
+          f"{len(ms) / elapsed:>9.1f}{percentile(probe_ms, 50):>11.1f}{percentile(probe_ms, 99):>11.1f}")
+
+
+def async_api(db, runner):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.db = db
+    app.state.runner = runner
+    app.state.scheduler = PeriodicScheduler(db, runner)  # Not started; only its stats are read
+
+    # The async client is created on uvicorn's event loop, which it binds to
+    @app.on_event("startup")
+    def open_client():
+        app.state.mongo = AsyncMongoClient(Config.MONGODB_URI, maxPoolSize=Config.API_MONGO_POOL_SIZE)
+        app.state.async_db = app.state.mongo[DATABASE]
+
+    @app.on_event("shutdown")
+    async def close_client():
+        await app.state.mongo.close()
+
+    return app
+
+
+def blocking_api(db, runner):
+    app = FastAPI()
+    app.include_router(legacy_router, prefix="/api")
+    app.state.db = db
+    app.state.runner = runner
+    app.state.scheduler = PeriodicScheduler(db, runner)  # Not started; only its stats are read
+    return app
+
+
+def main():
+    sources = int(sys.argv[1]) if len(sys.argv) > 1 else SOURCES
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else CLIENTS
+    requests_per_client = int(sys.argv[3]) if len(sys.argv) > 3 else REQUESTS_PER_CLIENT
+
+    mongo = MongoClient(Config.MONGODB_URI, serverSelectionTimeoutMS=5000)
+    db = mongo[DATABASE]
+    seed(db, sources)
+    runner = CrawlerRunner(db, workers=1)
+
+    print(f"{sources} sources, {clients} clients x {requests_per_client} requests of GET /api/sources (ms)")
+    print(f"{'':<8}{'p50':>9}{'p99':>9}{'mean':>9}{'req/s':>9}{'probe p50':>11}{'probe p99':>11}")
+    try:
+        for name, app in (("blocking", blocking_api(db, runner)), ("async", async_api(db, runner))):
+            base, server, thread = serve(app)
+            try:
+                report(name, *asyncio.run(load(base, clients, requests_per_client)))
+            finally:
+                server.should_exit = True
+                thread.join(timeout=10)
+    finally:
+        mongo.drop_database(DATABASE)
+
+
+if __name__ == "__main__":
+    main()
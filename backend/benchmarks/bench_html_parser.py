@@ -0,0 +1,67 @@
+"""
+Benchmark the HTML extraction backends of ContentParser.parse_html on a
+corpus of saved pages (*.html files in a directory). Without a corpus a set
+of synthetic news-like pages is generated.
+
+Run from the backend directory:
+    python -m benchmarks.bench_html_parser [path/to/saved/pages]
+"""
+import random
+import sys
+import timeit
+from pathlib import Path
+
+from app.services.content_parser import ContentParser, available_html_backends
+
+REPEAT = 5
+
+
+def synthetic_pages(count=50, seed=7):
+    rng = random.Random(seed)
+    words = "market bank growth policy report city school data cloud health energy climate minister".split()
+    pages = []
+    for i in range(count):
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choice(words) for _ in range(rng.randint(40, 120)))}</p>"
+            for _ in range(rng.randint(20, 80))
+        )
+        links = "".join(f'<li><a href="/article/{i}-{j}">Article {j}</a></li>' for j in range(rng.randint(50, 300)))
+        pages.append(
+            f"<html><head><title>Page {i}</title><style>body{{margin:0}}</style>"
+            f"<script>var tracking = {{id: {i}}};</script></head><body>"
+            f"<nav><ul>{links}</ul></nav><article>{paragraphs}</article>"
+            f"<footer>Footer text</footer></body></html>"
+        )
+    return [(f"https://example.com/page/{i}", p) for i, p in enumerate(pages)]
+
+
+def load_corpus(directory):
+    pages = []
+    for path in sorted(Path(directory).glob("*.html")):
+        pages.append((f"https://example.com/{path.name}", path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def main():
+    pages = load_corpus(sys.argv[1]) if len(sys.argv) > 1 else synthetic_pages()
+    if not pages:
+        sys.exit("No *.html files found")
+
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB total, best of {REPEAT}")
+    print(f"{'backend':<12}{'ms/page':>10}{'pages/s':>10}")
+
+    baseline = None
+    for backend in available_html_backends():
+        def run():
+            for url, html in pages:
+                ContentParser.parse_html(html, url, backend=backend)
+
+        best = min(timeit.repeat(run, number=1, repeat=REPEAT))
+        per_page = best / len(pages) * 1000
+        baseline = baseline or per_page
+        print(f"{backend:<12}{per_page:>10.2f}{len(pages) / best:>10.0f}  ({baseline / per_page:.1f}x vs bs4)")
+
+
+if __name__ == "__main__":
+    main()
@@ -129,74 +129,72 @@ export default function App() {
     }
   }
 
-  // Fetch stats for running crawlers
-  async function loadStatsForRunning() {
-    // Check both sourcesRef and current sources state
-    const currentSources = sources.length > 0 ? sources : sourcesRef.current;
-    const runningSources = currentSources.filter(s => 
-      s.runtime_status === "running" || s.runtime_status === "stopping"
-    );
-    if (runningSources.length === 0) return;
-
-    const statsPromises = runningSources.map(async (source) => {
-      try {
-        const res = await fetch(`${API}/sources/${source.id}/stats`);
-        const statsData = await res.json();
-        
-        // Convert stats API response to the format expected by renderStats
-        // Use real-time crawled count from backend
-        const pagesCrawled = statsData.current_run_crawled !== undefined 
-          ? statsData.current_run_crawled 
-          : (statsData.last_run?.crawled_count || 0);
-        
-        // Calculate runtime and rate if crawler is running
-        let runtimeSeconds = statsData.runtime_seconds || null;
-        let rate = statsData.rate || null;
-        
-        // Check if running by runtime_status or running flag
-        const isRunning = statsData.running || statsData.runtime_status === "running";
-        
-        if (isRunning && statsData.last_run?.started_at) {
-          const started = new Date(statsData.last_run.started_at);
-          const now = new Date();
-          runtimeSeconds = (now - started) / 1000;
-          
-          // Calculate rate from pages crawled and runtime
-          if (runtimeSeconds > 0 && pagesCrawled > 0) {
-            rate = pagesCrawled / runtimeSeconds;
-          }
-        }
-        
-        const stats = {
-          pages: statsData.total_pages || 0,
-          pages_crawled: pagesCrawled,
-          documents: pagesCrawled,
-          queued: 0,
-          errors: 0,
-          rate: rate,
-          pages_per_min: rate ? rate * 60 : null,
-          throughput: rate,
-          uptime: runtimeSeconds,
-          runtime_seconds: runtimeSeconds,
-        };
-
-        return { id: source.id, stats };
-      } catch (e) {
-        console.error(`Failed to fetch stats for ${source.id}:`, e);
-        return null;
-      }
-    });
-
-    const statsResults = await Promise.all(statsPromises);
-    
-    // Update sources with new stats
+  // Apply a run event pushed by GET /api/events to the matching source
+  function applyEvent(event) {
     setSources(prev => {
       const updated = prev.map(source => {
-        const statsResult = statsResults.find(s => s && s.id === source.id);
-        if (statsResult) {
-          return { ...source, stats: statsResult.stats };
+        if (source.id !== event.source_id) return source;
+
+        const stats = { ...(source.stats || {}) };
+        const lastRun = { ...(source.raw?.last_run || {}) };
+        let runtimeStatus = source.runtime_status;
+
+        switch (event.type) {
+          case "queued":
+            runtimeStatus = "queued";
+            break;
+          case "started":
+            runtimeStatus = "running";
+            lastRun.status = "running";
+            lastRun.started_at = event.started_at;
+            stats.pages_crawled = 0;
+            stats.documents = 0;
+            break;
+          case "progress":
+            stats.pages_crawled = event.crawled_count;
+            stats.documents = event.crawled_count;
+            if (event.total_pages !== null && event.total_pages !== undefined) {
+              stats.pages = event.total_pages;
+            }
+            break;
+          case "stopping":
+            runtimeStatus = "stopping";
+            break;
+          case "error":
+            stats.errors = safeNum(stats.errors) + 1;
+            break;
+          case "finished":
+            runtimeStatus = "idle";
+            lastRun.status = event.status;
+            lastRun.finished_at = event.finished_at;
+            stats.pages_crawled = event.crawled_count;
+            stats.documents = event.crawled_count;
+            break;
+          default:
+            return source;
+        }
+
+        // Same runtime and rate the backend reports for a running source
+        if (runtimeStatus === "running" && lastRun.started_at) {
+          const runtimeSeconds = (new Date() - new Date(lastRun.started_at)) / 1000;
+          const rate = runtimeSeconds > 0 ? safeNum(stats.pages_crawled) / runtimeSeconds : null;
+          Object.assign(stats, {
+            rate,
+            pages_per_min: rate ? rate * 60 : null,
+            throughput: rate,
+            uptime: runtimeSeconds,
+            runtime_seconds: runtimeSeconds,
+          });
+        } else if (runtimeStatus === "idle") {
+          Object.assign(stats, { rate: null, pages_per_min: null, throughput: null, uptime: null, runtime_seconds: null });
         }
-        return source;
+
+        return {
+          ...source,
+          runtime_status: runtimeStatus,
+          stats,
+          raw: { ...source.raw, last_run: lastRun },
+        };
       });
       sourcesRef.current = updated;
       return updated;
@@ -205,33 +203,28 @@ export default function App() {
 
   useEffect(() => {
     loadSources(false); // Initial load with loading indicator
-    
-    // Smart polling: check if we should poll
-    const pollInterval = setInterval(() => {
-      // Only poll if there are running crawlers, or poll less frequently if idle
-      const hasRunning = sourcesRef.current.some(s => s.runtime_status === "running");
-      if (hasRunning) {
-        loadSources(true); // Poll every interval when running
-        loadStatsForRunning(); // Also fetch detailed stats for running crawlers
-      } else {
-        // Poll less frequently when idle (every 3rd interval = 30 seconds)
-        const shouldPoll = Math.random() < 0.33; // 33% chance = roughly every 30 seconds
-        if (shouldPoll) {
-          loadSources(true);
-        }
+
+    // Run state is pushed by the backend instead of polled. The list is only
+    // reloaded when the stream reconnects, to catch up on anything missed.
+    const events = new EventSource(`${API}/events`);
+    let connected = false;
+    events.onopen = () => {
+      if (connected) loadSources(true);
+      connected = true;
+    };
+
+    const onEvent = (e) => {
+      try {
+        applyEvent(JSON.parse(e.data));
+      } catch (err) {
+        console.error(err);
       }
-    }, 10000); // Check every 10 seconds
-    
-    return () => clearInterval(pollInterval);
-  }, []);
+    };
+    const types = ["queued", "started", "progress", "stopping", "error", "finished"];
+    types.forEach(type => events.addEventListener(type, onEvent));
 
-  // Also fetch stats when sources change and there are running crawlers
-  useEffect(() => {
-    const hasRunning = sources.some(s => s.runtime_status === "running");
-    if (hasRunning) {
-      loadStatsForRunning();
-    }
-  }, [sources]);
+    return () => events.close();
+  }, []);
 
   const filtered = useMemo(() => {
     const s = search.trim().toLowerCase();